@@ -1,11 +1,13 @@
 from constants import BLUE, GREEN, RED
+from creatureSpec import EXAMPLE_CREATURE_SPEC, CreatureBatch, validateSpec
 from leg import Leg
 from legNode import LegNode
 from node import Node
+from renderCache import drawCircle
 import pygame
 from scipy.interpolate import CubicSpline
-import numpy as np
 from section import Section
+from targetProviders import MouseTargetProvider, TargetProvider
 
 class Body(Section):
     def __init__(self, nodes: list[Node], node_spacing: float):
@@ -13,43 +15,51 @@ class Body(Section):
         Holds a list of nodes. First node is anchor node
         """
         super().__init__(nodes, node_spacing)
+        self.targetProvider: TargetProvider = MouseTargetProvider()
         pass
 
     def displayEyes(self, screen: pygame.Surface):
         if len(self.lateralPoints) > 0 and len(self.lateralPoints[0]) > 5:
             eyeOne = self.lateralPoints[0][5]
             eyeTwo = self.lateralPoints[0][6]
-            pygame.draw.circle(screen, pygame.color.Color(255, 255, 255), (eyeOne[0], eyeOne[1]), 3)
-            pygame.draw.circle(screen, pygame.color.Color(255, 255, 255), (eyeTwo[0], eyeTwo[1]), 3)
+            drawCircle(screen, pygame.color.Color(255, 255, 255), (eyeOne[0], eyeOne[1]), 3)
+            drawCircle(screen, pygame.color.Color(255, 255, 255), (eyeTwo[0], eyeTwo[1]), 3)
 
     def setExampleBody(self):
-        bodyShape = [23, 25, 16, 23, 35, 35, 25, 10, 6, 4, 4, 4]
+        self.setFromSpec(validateSpec(EXAMPLE_CREATURE_SPEC))
+
+    def setFromSpec(self, spec: dict):
+        """
+        Builds the nodes and legs described by a validated creature spec (see creatureSpec.validateSpec).
+        """
+        x, y = spec["position"]
+        legAttachments = {legs["node"]: legs for legs in spec["legs"]}
+        bodyShape = spec["bodyShape"]
         for i in range(len(bodyShape)):
-            if i == 2 or i == 5:
-                # Create first leg
-                exampleLeg1 = Leg([], 15, Node(0, 0, 0, None))
-                exampleLeg1.setExampleLeg()
-                
-                # Create second leg
-                exampleLeg2 = Leg([], 15, Node(0, 0, 0, None))
-                exampleLeg2.setExampleLeg()
-                
-                # Create LegNode with two legs and their targets
+            if i in legAttachments:
+                attachment = legAttachments[i]
+                legs = []
+                for _ in attachment["targets"]:
+                    leg = Leg([], attachment["nodeSpacing"], Node(0, 0, 0, None))
+                    leg.setFromShape(attachment["legShape"], x, y)
+                    legs.append(leg)
+
+                # Create LegNode with its legs and their targets
                 self.nodes.append(LegNode(
-                    10, 10, bodyShape[i], self.nodes[i-1], 150,
-                    [exampleLeg1, exampleLeg2],  # Two legs
-                    [[80, np.pi/5], [80, -np.pi/5]]  # Targets for both legs
+                    x, y, bodyShape[i], self.nodes[i-1], attachment["updateDistance"],
+                    legs,
+                    [list(target) for target in attachment["targets"]]
                 ))
 
                 # Attach each leg to the LegNode
-                self.nodes[i].legs[0].attachedNode = self.nodes[i]
-                self.nodes[i].legs[1].attachedNode = self.nodes[i]
-            
+                for leg in legs:
+                    leg.attachedNode = self.nodes[i]
+
             else:
                 if i == 0:
-                    self.nodes.append(Node(10, 10, bodyShape[i], None))
+                    self.nodes.append(Node(x, y, bodyShape[i], None))
                 else:
-                    self.nodes.append(Node(10, 10, bodyShape[i], self.nodes[i-1]))
+                    self.nodes.append(Node(x, y, bodyShape[i], self.nodes[i-1]))
 
         # Update lateral points for all nodes
         self.lateralPoints = self.getLateralSetPointList()
@@ -58,7 +68,36 @@ class Body(Section):
                 for leg in node.legs:
                     leg.lateralPoints = leg.getLateralSetPointList()
 
-        
+    @classmethod
+    def fromSpec(cls, spec: dict) -> 'Body':
+        spec = validateSpec(spec)
+        body = cls([], spec["nodeSpacing"])
+        body.setFromSpec(spec)
+        return body
+
+    @classmethod
+    def fromBatch(cls, batch: CreatureBatch, index: int) -> 'Body':
+        """
+        Builds the node objects for one creature of a compiled batch at its current batch positions, e.g. to display it.
+        The batch has no legs, so they start on the head like a freshly spawned creature.
+        """
+        positions = batch.bodyPositions[index, :batch.bodyNodeCounts[index]].tolist()
+        body = cls.fromSpec(dict(batch.specs[index], position=positions[0]))
+        for node, position in zip(body.nodes, positions):
+            node.x, node.y = position
+        body.updateLateralPointSetPositions()
+        body.updateCurvePoints()
+        return body
+
+    def setOutlineSampler(self, sampler):
+        """
+        Sets the outline sampler of the body and all of its legs, None for uniform sampling.
+        """
+        self.outlineSampler = sampler
+        for node in self.nodes:
+            if isinstance(node, LegNode):
+                for leg in node.legs:
+                    leg.outlineSampler = sampler
 
     def followMouse(self, mousePos):
         distance = self.nodes[0].coordinateDistance(mousePos[0], mousePos[1])
@@ -71,12 +110,16 @@ class Body(Section):
         super().display(screen)
         self.displayEyes(screen)
 
-    def update(self, followMouse: bool):
+    def update(self, followMouse: bool, target=None):
+        """
+        Advances the body one tick. When following, the head moves towards target, or the next point of targetProvider
+        (the mouse by default) if no target is given.
+        """
         super().update()
         # self.kinematicsHandler.applyAngleConstraint(self.nodes, angle_margin=np.pi / 16)
 
         if followMouse:
-            self.followMouse(pygame.mouse.get_pos())
+            self.followMouse(target if target is not None else self.targetProvider.nextTarget())
 
         self.kinematicsHandler.applyForwardsDistanceConstraint(self.nodes)
 
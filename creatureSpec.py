@@ -0,0 +1,133 @@
+import json
+from typing import Optional
+
+import numpy as np
+
+from kinematicsHandler import KinematicsHandler
+from precision import getDtype
+
+EXAMPLE_LEG_SHAPE = [6, 6, 6, 6, 6]
+
+EXAMPLE_CREATURE_SPEC = {
+    "nodeSpacing": 25,
+    "position": [10, 10],
+    "bodyShape": [23, 25, 16, 23, 35, 35, 25, 10, 6, 4, 4, 4],
+    "legs": [
+        {"node": 2, "nodeSpacing": 15, "legShape": EXAMPLE_LEG_SHAPE, "updateDistance": 150,
+         "targets": [[80, np.pi / 5], [80, -np.pi / 5]]},
+        {"node": 5, "nodeSpacing": 15, "legShape": EXAMPLE_LEG_SHAPE, "updateDistance": 150,
+         "targets": [[80, np.pi / 5], [80, -np.pi / 5]]},
+    ],
+}
+
+
+def validateSpec(spec: dict) -> dict:
+    """
+    Checks a creature spec and fills in defaults. Raises ValueError describing the first problem found.
+    """
+    if not spec.get("bodyShape"):
+        raise ValueError("Creature spec needs a non-empty bodyShape")
+    bodyLength = len(spec["bodyShape"])
+    legs = []
+    seenNodes = set()
+    for leg in spec.get("legs", []):
+        node = leg.get("node")
+        if not isinstance(node, int) or node < 1 or node >= bodyLength:
+            raise ValueError(f"Leg attachment node {node} must be an index in 1..{bodyLength - 1}")
+        if node in seenNodes:
+            raise ValueError(f"Body node {node} has more than one leg attachment")
+        seenNodes.add(node)
+        if not leg.get("legShape"):
+            raise ValueError(f"Legs at node {node} need a non-empty legShape")
+        if not leg.get("targets"):
+            raise ValueError(f"Legs at node {node} need at least one target")
+        legs.append({
+            "node": node,
+            "nodeSpacing": leg.get("nodeSpacing", 15),
+            "legShape": list(leg["legShape"]),
+            "updateDistance": leg.get("updateDistance", 150),
+            "targets": [[float(r), float(theta)] for r, theta in leg["targets"]],
+        })
+    return {
+        "nodeSpacing": spec.get("nodeSpacing", 25),
+        "position": list(spec.get("position", [10, 10])),
+        "bodyShape": list(spec["bodyShape"]),
+        "legs": sorted(legs, key=lambda leg: leg["node"]),
+    }
+
+
+def loadSpec(path: str) -> dict:
+    with open(path) as file:
+        return validateSpec(json.load(file))
+
+
+def loadSpecs(path: str) -> list[dict]:
+    """
+    Loads a JSON file holding either a single creature spec or a list of them.
+    """
+    with open(path) as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = [data]
+    return [validateSpec(spec) for spec in data]
+
+
+class CreatureBatch:
+    def __init__(self, specs: list[dict]):
+        """
+        Flat array layout of the body chains of a batch of creatures, padded to the largest creature with the real sizes
+        in bodyNodeCounts. Legs are not part of the batch yet, Body.fromBatch builds them from the spec for display.
+        """
+        self.specs = specs
+        count = len(specs)
+        maxBodyNodes = max(len(spec["bodyShape"]) for spec in specs)
+        self.nodeSpacing = np.zeros(count, dtype=getDtype())
+        self.bodyNodeCounts = np.array([len(spec["bodyShape"]) for spec in specs], dtype=np.int32)
+        self.bodyPositions = np.zeros((count, maxBodyNodes, 2), dtype=getDtype())
+        # Spacing is per creature, passed from nodeSpacing on every call
+        self.kinematicsHandler = KinematicsHandler(0)
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def bodyMask(self) -> np.ndarray:
+        return np.arange(self.bodyPositions.shape[1]) < self.bodyNodeCounts[:, None]
+
+    def updateBodies(self, targets: np.ndarray):
+        """
+        Advances the body chains of every creature one tick towards a (creatures, 2) array of targets, matching the body
+        nodes of Body.update: constrain, move the head 1/30 of the way to the target, constrain again. Legs are not stepped.
+        """
+        handler = self.kinematicsHandler
+        handler.applyBatchedForwardsDistanceConstraint(self.bodyPositions, self.bodyNodeCounts, self.nodeSpacing)
+
+        head = self.bodyPositions[:, 0]
+        offset = np.asarray(targets, dtype=self.bodyPositions.dtype).reshape(len(self), 2) - head
+        distance = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+        moving = distance > 0
+        head[moving] = head[moving] + (distance / 30)[moving][:, None] * offset[moving] / distance[moving][:, None]
+
+        handler.applyBatchedForwardsDistanceConstraint(self.bodyPositions, self.bodyNodeCounts, self.nodeSpacing)
+
+
+def compileSpecs(specs: list[dict], positions: Optional[np.ndarray] = None) -> CreatureBatch:
+    """
+    Compiles creature specs into a CreatureBatch without building any node objects. Every node starts at the spec
+    position, or at the matching row of positions when given, like the nodes built by Body.setFromSpec.
+    """
+    if len(specs) == 0:
+        raise ValueError("Cannot compile an empty batch of creature specs")
+    # Crowds usually repeat the same spec, so each distinct spec object is validated once
+    validated: dict[int, dict] = {}
+    for spec in specs:
+        if id(spec) not in validated:
+            validated[id(spec)] = validateSpec(spec)
+    specs = [validated[id(spec)] for spec in specs]
+    batch = CreatureBatch(specs)
+    if positions is None:
+        positions = np.array([spec["position"] for spec in specs], dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64).reshape(len(specs), 2)
+
+    batch.nodeSpacing[:] = [spec["nodeSpacing"] for spec in specs]
+    batch.bodyPositions[:] = positions[:, None, :]
+    return batch
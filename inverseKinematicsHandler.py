@@ -6,9 +6,11 @@ from node import Node
 
 class InverseKinematicsHandler(KinematicsHandler):
 
-    def __init__(self, errorMargin: float, node_spacing: float):
+    def __init__(self, errorMargin: float, node_spacing: float, maxIterations: int = 100):
         super().__init__(node_spacing)
         self.errorMargin = errorMargin
+        # Some folded chains never get within errorMargin, so give up after this many iterations
+        self.maxIterations = maxIterations
     
     def backwardReach(self, nodes: list[Node], start: Tuple[int, int]) -> list[Node]:
         updatedNodes = nodes
@@ -25,9 +27,18 @@ class InverseKinematicsHandler(KinematicsHandler):
     def fabrik(self, nodes: list[Node], target: Tuple[int, int]) -> list[Node]:
         updatedNodes: list[Node] = nodes
         start: Tuple[int, int] = [nodes[0].x, nodes[0].y]
+        iterations = 0
         while self.calculateError(updatedNodes, target) > self.errorMargin:
+            if iterations >= self.maxIterations:
+                if self.counters is not None:
+                    self.counters.fabrikStalls += 1
+                break
             updatedNodes = self.forwardReach(updatedNodes, target)
             updatedNodes = self.backwardReach(updatedNodes, start)
+            iterations += 1
+        if self.counters is not None:
+            self.counters.fabrikSolves += 1
+            self.counters.fabrikIterations += iterations
         return updatedNodes
 
     def calculateError(self, nodes: list[Node], target: Tuple[int, int]) -> float:
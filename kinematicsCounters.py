@@ -0,0 +1,93 @@
+import csv
+import json
+from typing import Optional
+
+from body import Body
+from legNode import LegNode
+
+COUNTER_NAMES = [
+    "constraintCorrections",  # Nodes moved by applyForwardsDistanceConstraint
+    "fabrikSolves",           # Calls to fabrik from moveLegEndTo
+    "fabrikIterations",       # Forward/backward reach passes across those calls
+    "fabrikStalls",           # Solves that hit maxIterations without reaching the target
+    "tooFarExtensions",       # moveLegEndTo calls sent to extendTowards because the target was out of reach
+    "stepEvents",             # LegNode.update steps taken because a leg drifted past updateDistance
+]
+
+
+class KinematicsCounters:
+    def __init__(self):
+        """
+        Event counts for one creature. The kinematics code increments these directly when they are attached.
+        """
+        self.reset()
+
+    def reset(self):
+        for name in COUNTER_NAMES:
+            setattr(self, name, 0)
+
+    def snapshot(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTER_NAMES}
+
+
+def attachCounters(body: Body, counters: Optional[KinematicsCounters]):
+    """
+    Points the body's kinematics handlers, leg nodes and legs at counters. Pass None to detach.
+    """
+    body.kinematicsHandler.counters = counters
+    for node in body.nodes:
+        if isinstance(node, LegNode):
+            node.counters = counters
+            for leg in node.legs:
+                leg.kinematicsHandler.counters = counters
+
+
+def sumCounts(counts: list[dict[str, int]]) -> dict[str, int]:
+    return {name: sum(count[name] for count in counts) for name in COUNTER_NAMES}
+
+
+class CounterRecorder:
+    def __init__(self):
+        """
+        Collects per creature counters into per tick records that can be queried or exported.
+        """
+        self.creatures: dict[str, KinematicsCounters] = {}
+        self.ticks: list[dict[str, dict[str, int]]] = []
+
+    def attach(self, name: str, body: Body) -> KinematicsCounters:
+        counters = KinematicsCounters()
+        attachCounters(body, counters)
+        self.creatures[name] = counters
+        return counters
+
+    def endTick(self) -> dict[str, dict[str, int]]:
+        """
+        Records and resets the counts of every creature. Call once after each simulation tick.
+        """
+        record = {}
+        for name, counters in self.creatures.items():
+            record[name] = counters.snapshot()
+            counters.reset()
+        self.ticks.append(record)
+        return record
+
+    def perTick(self) -> list[dict[str, int]]:
+        return [sumCounts(list(record.values())) for record in self.ticks]
+
+    def perCreature(self) -> dict[str, dict[str, int]]:
+        return {name: sumCounts([record[name] for record in self.ticks if name in record]) for name in self.creatures}
+
+    def totals(self) -> dict[str, int]:
+        return sumCounts(self.perTick())
+
+    def exportCsv(self, path: str):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["tick", "creature"] + COUNTER_NAMES)
+            for tick, record in enumerate(self.ticks):
+                for name, counts in record.items():
+                    writer.writerow([tick, name] + [counts[counter] for counter in COUNTER_NAMES])
+
+    def exportJson(self, path: str):
+        with open(path, "w") as file:
+            json.dump({"ticks": self.ticks, "perCreature": self.perCreature(), "totals": self.totals()}, file)
@@ -5,6 +5,8 @@ from node import Node
 class KinematicsHandler:
     def __init__(self, node_spacing: float):
         self.node_spacing = node_spacing
+        # Optional KinematicsCounters, see kinematicsCounters.attachCounters
+        self.counters = None
 
     def applyForwardsDistanceConstraint(self, nodes: list[Node]):
         """
@@ -15,6 +17,33 @@ class KinematicsHandler:
             distance = nodes[i].nodeDistance(nodes[i-1])
             if i > 0 and distance > self.node_spacing:
                 nodes[i].normalize(nodes[i-1].x, nodes[i-1].y, distance - self.node_spacing)
+                if self.counters is not None:
+                    self.counters.constraintCorrections += 1
+
+    def applyBatchedForwardsDistanceConstraint(self, positions: np.ndarray, nodeCounts=None, nodeSpacing=None) -> np.ndarray:
+        """
+        applyForwardsDistanceConstraint for many chains at once. positions is a (creatures, nodes, 2) array and is updated in
+        place, looping over the chain index and vectorized over creatures, with the same arithmetic as Node.normalize.
+        :param nodeCounts: Optional (creatures,) real chain lengths, nodes past them are left untouched.
+        :param nodeSpacing: Optional scalar or (creatures,) spacing, node_spacing by default.
+        """
+        spacing = self.node_spacing if nodeSpacing is None else np.asarray(nodeSpacing, dtype=positions.dtype)
+        if nodeCounts is not None:
+            nodeCounts = np.asarray(nodeCounts)
+        for i in range(1, positions.shape[1]):
+            node = positions[:, i]
+            offset = positions[:, i - 1] - node
+            distance = np.sqrt(offset[:, 0] ** 2 + offset[:, 1] ** 2)
+            moved = distance > spacing
+            if nodeCounts is not None:
+                moved &= i < nodeCounts
+            if not moved.any():
+                continue
+            travel = (distance - spacing)[moved]
+            node[moved] = node[moved] + travel[:, None] * offset[moved] / distance[moved][:, None]
+            if self.counters is not None:
+                self.counters.constraintCorrections += int(np.count_nonzero(moved))
+        return positions
 
     def applyBackwardsDistanceConstraint(self, nodes: list[Node]):
         """
@@ -1,5 +1,6 @@
 from typing import Tuple
 import pygame
+from creatureSpec import EXAMPLE_LEG_SHAPE
 from node import Node
 from section import Section
 
@@ -11,12 +12,14 @@ class Leg(Section):
 
     
     def setExampleLeg(self):
-        legShape = [6, 6, 6, 6, 6]
+        self.setFromShape(EXAMPLE_LEG_SHAPE)
+
+    def setFromShape(self, legShape: list[int], x: float = 10, y: float = 10):
         for i in range(len(legShape)):
             if i == 0:
-                self.nodes.append(Node(10, 10, legShape[i], None))
+                self.nodes.append(Node(x, y, legShape[i], None))
             else:
-                self.nodes.append(Node(10, 10, legShape[i], self.nodes[i-1]))
+                self.nodes.append(Node(x, y, legShape[i], self.nodes[i-1]))
         self.lateralPoints = self.getLateralSetPointList()
 
     def update(self):
@@ -25,6 +28,8 @@ class Leg(Section):
 
     def moveLegEndTo(self, target: Tuple[int, int]):
         if self.kinematicsHandler.tooFar(self.nodes, target):
+            if self.kinematicsHandler.counters is not None:
+                self.kinematicsHandler.counters.tooFarExtensions += 1
             self.extendTowards(target, 0.7)
         else:
             self.nodes = self.kinematicsHandler.fabrik(self.nodes, target)
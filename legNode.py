@@ -4,6 +4,7 @@ import numpy
 import pygame
 from leg import Leg
 from node import Node
+from renderCache import drawCircle, getFont
 
 
 class LegNode(Node):
@@ -19,6 +20,8 @@ class LegNode(Node):
         self.targets: list[Tuple[float, float]] = targets
         self.currentTargets: list[Tuple[float, float]] = self.getAllTargetPositions()
         self.updateDistance: float = updateDistance
+        # Optional KinematicsCounters, see kinematicsCounters.attachCounters
+        self.counters = None
 
     def updateTargetPosition(self, forward: Tuple[int, int], legIndex: int):
         newTarget: Tuple[float, float] = self.getRelativePoint(forward[0], forward[1], self.targets[legIndex][0], self.targets[legIndex][1])
@@ -33,7 +36,6 @@ class LegNode(Node):
         for legIndex in range(len(self.legs)):
             cartesian_target = self.getTargetPosition([self.prevNode.x, self.prevNode.y], legIndex)
             newTargets.append(cartesian_target)
-            print(f"Leg {legIndex} target (polar to Cartesian): {cartesian_target}")
         return newTargets
 
     
@@ -58,6 +60,8 @@ class LegNode(Node):
             distance = numpy.sqrt(numpy.square(xDiff) + numpy.square(yDiff))
             if distance > self.updateDistance:
                 self.updateTargetPosition(forward, i)
+                if self.counters is not None:
+                    self.counters.stepEvents += 1
         self.moveLegsTowardsTarget()
 
     def displayLegs(self, screen: pygame.Surface):
@@ -70,7 +74,7 @@ class LegNode(Node):
         Displays all current target points and original target points onto the given pygame surface.
         :param screen: The pygame surface to draw on.
         """
-        font = pygame.font.Font(None, 24)  # Font for text labels
+        font = getFont(None, 24)  # Font for text labels
 
         for i, leg in enumerate(self.legs):
             # Display original target points (polar coordinates as text)
@@ -84,12 +88,12 @@ class LegNode(Node):
                                                      original_target[0], original_target[1])
 
             # Draw original target point (as a small red circle)
-            pygame.draw.circle(screen, pygame.color.Color('red'), (int(polar_x), int(polar_y)), 5)
+            drawCircle(screen, pygame.color.Color('red'), (int(polar_x), int(polar_y)), 5)
 
             # Draw current target point (as a small blue circle)
             current_target = self.currentTargets[i]
-            pygame.draw.circle(screen, pygame.color.Color('blue'), 
-                               (int(current_target[0]), int(current_target[1])), 5)
+            drawCircle(screen, pygame.color.Color('blue'),
+                       (int(current_target[0]), int(current_target[1])), 5)
 
             # Optionally, draw connecting lines for better visualization
             pygame.draw.line(screen, pygame.color.Color('yellow'), 
@@ -0,0 +1,146 @@
+import argparse
+import cProfile
+import pstats
+import time
+from typing import Optional
+
+import numpy as np
+
+from body import Body
+from creatureSpec import EXAMPLE_CREATURE_SPEC, CreatureBatch, compileSpecs, loadSpec, validateSpec
+from kinematicsCounters import CounterRecorder
+from precision import PRECISIONS, setPrecision
+from targetProviders import PROVIDER_KINDS, Bounds, TargetProvider, createCrowdProviders
+
+DEFAULT_BOUNDS: Bounds = (0, 0, 1000, 700)
+
+
+class LoadReport:
+    def __init__(self, creatures: int, ticks: int, seconds: float):
+        self.creatures = creatures
+        self.ticks = ticks
+        self.seconds = seconds
+
+    @property
+    def creatureTicks(self) -> int:
+        return self.creatures * self.ticks
+
+    @property
+    def creatureTicksPerSecond(self) -> float:
+        return self.creatureTicks / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self) -> str:
+        return (f"{self.creatures} creatures x {self.ticks} ticks in {self.seconds:.3f}s: "
+                f"{self.creatureTicksPerSecond:.1f} creature-ticks/s")
+
+
+def createCrowd(providers: list[TargetProvider], spec: Optional[dict] = None) -> list[Body]:
+    """
+    Spawns one creature per provider, starting at the provider's first target, with the provider attached.
+    """
+    spec = validateSpec(spec if spec is not None else EXAMPLE_CREATURE_SPEC)
+    bodies = []
+    for provider in providers:
+        start = provider.nextTarget()
+        provider.reset()
+        body = Body.fromSpec(dict(spec, position=[float(start[0]), float(start[1])]))
+        body.targetProvider = provider
+        bodies.append(body)
+    return bodies
+
+
+def createBatch(providers: list[TargetProvider], spec: Optional[dict] = None) -> CreatureBatch:
+    """
+    Compiles one creature body chain per provider, starting at the provider's first target, without building node objects.
+    """
+    starts = []
+    for provider in providers:
+        starts.append(provider.nextTarget())
+        provider.reset()
+    spec = validateSpec(spec if spec is not None else EXAMPLE_CREATURE_SPEC)
+    return compileSpecs([spec] * len(providers), np.array(starts, dtype=np.float64))
+
+
+def runBatchLoad(batch: CreatureBatch, providers: list[TargetProvider], ticks: int) -> LoadReport:
+    """
+    Steps the body chains of a batch for a fixed number of ticks, each following its own provider, and times the run.
+    """
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.updateBodies(np.array([provider.nextTarget() for provider in providers]))
+    return LoadReport(len(batch), ticks, time.perf_counter() - start)
+
+
+def runLoad(bodies: list[Body], ticks: int, recorder: Optional[CounterRecorder] = None) -> LoadReport:
+    """
+    Updates every body for a fixed number of ticks, each following its own target provider, and times the whole run.
+    With a recorder, the kinematics counters attached through it are closed off after every tick.
+    """
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for body in bodies:
+            body.update(followMouse=True)
+        if recorder is not None:
+            recorder.endTick()
+    return LoadReport(len(bodies), ticks, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive creatures with scripted targets and report throughput")
+    parser.add_argument("--creatures", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--targets", choices=PROVIDER_KINDS + ["trace"], default="wander")
+    parser.add_argument("--trace", default=None, metavar="PATH", help="Recorded trace for --targets trace")
+    parser.add_argument("--spec", default=None, metavar="PATH", help="Creature spec JSON, the example creature by default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--precision", choices=list(PRECISIONS), default="float64", help="Float type of the CreatureBatch arrays used by --batched")
+    parser.add_argument("--batched", action="store_true", help="Step only the body chains, as one CreatureBatch")
+    parser.add_argument("--profile", action="store_true", help="Print the top functions by cumulative time")
+    parser.add_argument("--counters", default=None, metavar="PATH", help="Export per tick kinematics counters (.csv or .json)")
+    args = parser.parse_args()
+    setPrecision(args.precision)
+
+    providers = createCrowdProviders(args.targets, args.creatures, DEFAULT_BOUNDS, args.seed, args.trace)
+    spec = loadSpec(args.spec) if args.spec else None
+    if args.batched:
+        if args.counters is not None:
+            parser.error("--counters needs per creature bodies, it cannot be used with --batched")
+        start = time.perf_counter()
+        batch = createBatch(providers, spec)
+        print(f"Spawned {len(batch)} creatures in {time.perf_counter() - start:.3f}s")
+        if args.profile:
+            profiler = cProfile.Profile()
+            report = profiler.runcall(runBatchLoad, batch, providers, args.ticks)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        else:
+            report = runBatchLoad(batch, providers, args.ticks)
+        print(report)
+        return
+
+    start = time.perf_counter()
+    bodies = createCrowd(providers, spec)
+    print(f"Spawned {len(bodies)} creatures in {time.perf_counter() - start:.3f}s")
+    recorder = None
+    if args.counters is not None:
+        recorder = CounterRecorder()
+        for i, body in enumerate(bodies):
+            recorder.attach(f"creature{i}", body)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        report = profiler.runcall(runLoad, bodies, args.ticks, recorder)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    else:
+        report = runLoad(bodies, args.ticks, recorder)
+    print(report)
+
+    if recorder is not None:
+        print(" ".join(f"{name}={count}" for name, count in recorder.totals().items()))
+        if args.counters.endswith(".json"):
+            recorder.exportJson(args.counters)
+        else:
+            recorder.exportCsv(args.counters)
+
+
+if __name__ == "__main__":
+    main()
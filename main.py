@@ -1,6 +1,13 @@
+import argparse
 import pygame
 from body import Body
 from node import Node
+from outlineSampling import AdaptiveOutlineSampler
+from rasterizer import rasterizeBodiesToSurface
+from renderCache import drawCircle
+from renderPipeline import RenderPipeline
+from stateServer import StateServer
+from targetProviders import PROVIDER_KINDS, RecordedTargetProvider, TraceRecorder, createCrowdProviders
 
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
@@ -20,6 +27,10 @@ class WorldState:
         self.displayCircles = True
         self.displayConnections = False
         self.displayLateralPoints = False
+        self.stateServer = None
+        self.pipelined = False
+        self.softwareRaster = False
+        self.outlineSampler = None
     
     def handleKeyBoardInput(self):
         for event in pygame.event.get():
@@ -40,9 +51,13 @@ class WorldState:
                     self.body.switchColor()
 
     def drawMouse(self):
-        pygame.draw.circle(self.screen, pygame.color.Color(255, 255, 255), (self.mousePos[0], self.mousePos[1]), 5)
+        drawCircle(self.screen, pygame.color.Color(255, 255, 255), (self.mousePos[0], self.mousePos[1]), 5)
+
+    def draw(self, body: Body = None):
+        # Draw the live body unless given a render copy
+        if body is None:
+            body = self.body
 
-    def draw(self):
         # Reset screen
         self.screen.fill(pygame.color.Color(50, 50, 60))
 
@@ -51,48 +66,133 @@ class WorldState:
 
         if self.displayCircles:
             # Display Nodes in Body
-            self.body.displayNodes(self.screen)
+            body.displayNodes(self.screen)
 
         if self.displayLateralPoints:
             # Display lateral points
-            self.body.displayLateralPoints(self.screen)
+            body.displayLateralPoints(self.screen)
 
         if self.displayConnections:
             # Display body connections
-            self.body.displayLinesBetweenNodes(self.screen)
+            body.displayLinesBetweenNodes(self.screen)
 
         if self.displayParametric:
-            # Display parametric curve
-            self.body.display(self.screen)
+            if self.softwareRaster:
+                # Fill all outlines in one NumPy pass, without the outline strokes
+                rasterizeBodiesToSurface(self.screen, [body])
+                body.displayEyes(self.screen)
+            else:
+                # Display parametric curve
+                body.display(self.screen)
     
     def update(self):
-        # Update mouse position
-        self.mousePos = pygame.mouse.get_pos()
+        # Update target position, the mouse unless a scripted provider is set
+        self.mousePos = self.body.targetProvider.nextTarget()
 
-        # Move head of body towards mouse
-        self.body.update(followMouse=True)
+        # Move head of body towards target
+        if self.outlineSampler is not None:
+            self.outlineSampler.beginFrame()
+        self.body.update(followMouse=True, target=self.mousePos)
 
         self.handleKeyBoardInput()
     
 def main():
+    parser = argparse.ArgumentParser(description="Procedural animation")
+    parser.add_argument("--serve", type=int, default=None, metavar="PORT", help="Stream simulation state on localhost PORT")
+    parser.add_argument("--serve-unix", default=None, metavar="PATH", help="Stream simulation state on a Unix domain socket")
+    parser.add_argument("--pipelined", action="store_true", help="Experimental: update the next tick on a worker thread while drawing the current one. The update is mostly GIL bound Python and no frame time gain has been measured yet")
+    parser.add_argument("--software-raster", action="store_true", help="Fill creature outlines with the NumPy rasterizer")
+    parser.add_argument("--adaptive-outlines", action="store_true", help="Sample outlines by curvature and screen size")
+    parser.add_argument("--outline-budget", type=int, default=None, metavar="SAMPLES", help="Outline samples per frame with --adaptive-outlines")
+    parser.add_argument("--targets", choices=PROVIDER_KINDS, default=None, help="Follow a scripted path instead of the mouse")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for random-walk and wander targets")
+    parser.add_argument("--replay", default=None, metavar="PATH", help="Follow a recorded trace")
+    parser.add_argument("--record", default=None, metavar="PATH", help="Record the followed targets to a trace file")
+    args = parser.parse_args()
+
     ws = WorldState()
+    ws.pipelined = args.pipelined
+    ws.softwareRaster = args.software_raster
+    if args.adaptive_outlines:
+        ws.outlineSampler = AdaptiveOutlineSampler(frameBudget=args.outline_budget)
+    if args.replay is not None:
+        ws.body.targetProvider = RecordedTargetProvider.fromFile(args.replay)
+    elif args.targets is not None:
+        ws.body.targetProvider = createCrowdProviders(args.targets, 1, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), args.seed)[0]
+    if args.record is not None:
+        ws.body.targetProvider = TraceRecorder(ws.body.targetProvider)
+    if args.serve is not None or args.serve_unix is not None:
+        ws.stateServer = StateServer(port=args.serve or 0, path=args.serve_unix)
+        ws.stateServer.start()
+        print(f"Streaming simulation state on {args.serve_unix or f'127.0.0.1:{ws.stateServer.port}'}")
     runGame(ws)
+    if args.record is not None:
+        ws.body.targetProvider.save(args.record)
         
 
 def runGame(ws: WorldState):
     # Set body to example
     ws.body.setExampleBody()
+    if ws.outlineSampler is not None:
+        ws.body.setOutlineSampler(ws.outlineSampler)
+
+    if ws.pipelined:
+        runPipelinedGame(ws)
+        return
 
     while ws.running:
 
         ws.draw()
         ws.update()
 
+        # Publish tick to viewers without waiting on them
+        if ws.stateServer is not None:
+            ws.stateServer.publishBody(ws.body)
+
         # Update screen
         pygame.display.flip()
         ws.clock.tick(60)
     
     # Quit pygame when not runnning
+    if ws.stateServer is not None:
+        ws.stateServer.stop()
+    pygame.quit()
+
+
+def runPipelinedGame(ws: WorldState):
+    """
+    Same loop as runGame, but the update of the next tick runs on a worker thread while the current tick is drawn.
+    Experimental: on one core it measured slower than runGame, and no multi-core gain has been measured.
+    """
+    pipeline = RenderPipeline()
+
+    while ws.running:
+        # Copy this tick for drawing before the worker starts changing the body
+        frame = pipeline.capture(ws.body)
+
+        # Move head of body towards target on the worker
+        mousePos = ws.body.targetProvider.nextTarget()
+        if ws.outlineSampler is not None:
+            ws.outlineSampler.beginFrame()
+        pipeline.startUpdate(ws.body, followMouse=True, target=mousePos)
+
+        ws.draw(frame)
+        pygame.display.flip()
+
+        # Input is handled after the update, like WorldState.update does
+        pipeline.finishUpdate()
+        ws.mousePos = mousePos
+        ws.handleKeyBoardInput()
+
+        # Publish tick to viewers without waiting on them
+        if ws.stateServer is not None:
+            ws.stateServer.publishBody(ws.body)
+
+        ws.clock.tick(60)
+
+    pipeline.close()
+    if ws.stateServer is not None:
+        ws.stateServer.stop()
     pygame.quit()
 
 
@@ -1,6 +1,7 @@
 import numpy as np
 import pygame
 from typing import Tuple
+from renderCache import drawCircle
 
 Coordinate = Tuple[float, float]
 
@@ -22,22 +23,21 @@ class Node:
         """
         Takes in a target x and y position and a distance float value and moves node that distance towards given node
         """
-        if self.coordinateDistance(targetX, targetY) < travelDistance:
+        distance = self.coordinateDistance(targetX, targetY)
+        if distance < travelDistance:
             self.x = targetX
             self.y = targetY
+        elif distance == 0:
+            # No direction to the target, keep the old fallback of moving along 45 degrees
+            self.x = self.x + travelDistance * np.cos(np.pi / 4)
+            self.y = self.y + travelDistance * np.sin(np.pi / 4)
         else:
-            slope = 1
-            if not (targetX - self.x) == 0:
-                slope = (targetY - self.y) / (targetX - self.x)
-            theta = np.arctan(slope)
-            coef = 1
-            if targetX < self.x:
-                coef = -1
-            self.x = self.x + travelDistance * np.cos(theta) * coef
-            self.y = self.y + travelDistance * np.sin(theta) * coef
+            # Rescale the vector to the target, KinematicsHandler.applyBatchedForwardsDistanceConstraint does the same
+            self.x = self.x + travelDistance * (targetX - self.x) / distance
+            self.y = self.y + travelDistance * (targetY - self.y) / distance
 
     def display(self, screen: pygame.Surface):
-        pygame.draw.circle(screen, pygame.color.Color(255, 255, 255), (self.x, self.y), self.size, 3)
+        drawCircle(screen, pygame.color.Color(255, 255, 255), (self.x, self.y), self.size, 3)
 
     def getRelativePoint(self, targetX: int, targetY: int, distance: float, deltaTheta: float = 0):
         """
@@ -50,7 +50,7 @@ class Node:
             elif targetY < self.y:
                 theta = -np.pi / 2  # Downwards
             else:
-                print("Error: Target and current node are at the same position.")
+                # Target and current node are at the same position, so there is no direction to offset along
                 return [self.x, self.y]
         else:
             # General case: calculate angle using arctan2 for correct quadrant handling
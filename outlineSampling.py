@@ -0,0 +1,79 @@
+from typing import Optional
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+# Where each knot interval is probed for its length and curvature, as fractions of the interval
+PROBE_FRACTIONS = np.linspace(0, 1, 5)
+
+
+class AdaptiveOutlineSampler:
+    def __init__(self, scale: float = 1.0, tolerance: float = 0.25, maxSegmentLength: float = 12.0,
+                 maxSamplesPerInterval: int = 64, frameBudget: Optional[int] = None):
+        """
+        Chooses the curve parameters an outline spline is sampled at. Each knot interval gets just enough samples that the
+        polygon strays at most tolerance pixels from the curve, judged by its curvature and on-screen length, and no edge
+        is longer than maxSegmentLength pixels.
+        :param scale: Screen pixels per world unit, so zoomed out creatures get fewer samples.
+        :param frameBudget: Optional total samples per frame. When the previous frame asked for more, every interval is
+            scaled down by the same factor. Call beginFrame once per frame for it to apply.
+        """
+        self.scale = scale
+        self.tolerance = tolerance
+        self.maxSegmentLength = maxSegmentLength
+        self.maxSamplesPerInterval = maxSamplesPerInterval
+        self.frameBudget = frameBudget
+        self.budgetScale = 1.0
+        self.demand = 0
+        self.samples = 0
+
+    def beginFrame(self):
+        """
+        Resets the frame counts and sets this frame's budget scale from the samples the previous frame asked for.
+        """
+        if self.frameBudget is not None and self.demand > self.frameBudget:
+            self.budgetScale = self.frameBudget / self.demand
+        else:
+            self.budgetScale = 1.0
+        self.demand = 0
+        self.samples = 0
+
+    def getSampleCounts(self, xSpline: CubicSpline, ySpline: CubicSpline, first: int, last: int) -> np.ndarray:
+        """
+        Returns how many samples each knot interval from first up to last needs, before the frame budget is applied.
+        """
+        widths = np.diff(xSpline.x[first:last + 1])
+        s = widths[:, None] * PROBE_FRACTIONS
+
+        # Derivatives straight from the piecewise cubic coefficients, c[0] * s^3 + c[1] * s^2 + c[2] * s + c[3]
+        xc, yc = xSpline.c[:, first:last, None], ySpline.c[:, first:last, None]
+        dx, dy = (3 * xc[0] * s + 2 * xc[1]) * s + xc[2], (3 * yc[0] * s + 2 * yc[1]) * s + yc[2]
+        ddx, ddy = 6 * xc[0] * s + 2 * xc[1], 6 * yc[0] * s + 2 * yc[1]
+        speed = np.sqrt(dx ** 2 + dy ** 2)
+
+        # Curvature in world units, then both measures projected to the screen
+        curvature = np.abs(dx * ddy - dy * ddx) / np.maximum(speed, 1e-9) ** 3
+        length = speed.mean(axis=1) * widths * self.scale
+        screenCurvature = curvature.max(axis=1) / self.scale
+
+        # A chord of length s on a circle of curvature k deviates k * s^2 / 8 from it
+        curvatureCounts = length * np.sqrt(screenCurvature / (8 * self.tolerance))
+        counts = np.maximum(curvatureCounts, length / self.maxSegmentLength)
+        return np.clip(np.ceil(counts), 1, self.maxSamplesPerInterval).astype(np.int64)
+
+    def sampleTimes(self, xSpline: CubicSpline, ySpline: CubicSpline, startT: float, endT: float) -> np.ndarray:
+        """
+        Returns increasing parameters in [startT, endT) for a spline pair whose knots include startT and endT.
+        """
+        first = int(np.searchsorted(xSpline.x, startT))
+        last = int(np.searchsorted(xSpline.x, endT))
+        knots = xSpline.x[first:last + 1]
+        counts = self.getSampleCounts(xSpline, ySpline, first, last)
+        self.demand += int(counts.sum())
+        if self.budgetScale < 1:
+            counts = np.maximum(np.floor(counts * self.budgetScale), 1).astype(np.int64)
+        self.samples += int(counts.sum())
+
+        interval = np.repeat(np.arange(len(counts)), counts)
+        step = np.arange(len(interval)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return knots[interval] + np.diff(knots)[interval] * step / counts[interval]
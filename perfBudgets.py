@@ -0,0 +1,40 @@
+import json
+import os
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_budgets.json")
+
+# Counts are deterministic for a seeded workload, so they only get room for floating point differences between machines.
+# Timings are divided by a calibration run and may grow by TIME_TOLERANCE before failing.
+COUNT_TOLERANCE = 0.05
+TIME_TOLERANCE = 2.0
+
+
+def loadBudgets(path: str = BUDGETS_PATH) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def saveBudgets(results: dict, path: str = BUDGETS_PATH):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=4, sort_keys=True)
+        file.write("\n")
+
+
+def findOverBudget(results: dict, budgets: dict) -> list[str]:
+    """
+    Returns a line for every count or normalized timing that exceeds its budget, or is missing one.
+    """
+    failures = []
+    for name, result in results.items():
+        if name not in budgets:
+            failures.append(f"{name}: no budget, run perfTest.py --update-budgets")
+            continue
+        for key, value in result["counts"].items():
+            budget = budgets[name]["counts"].get(key)
+            if budget is None or value > budget * (1 + COUNT_TOLERANCE):
+                failures.append(f"{name}: {key} {value} over budget {budget}")
+        for key, value in result["normalizedTimes"].items():
+            budget = budgets[name]["normalizedTimes"].get(key)
+            if budget is None or value > budget * TIME_TOLERANCE:
+                failures.append(f"{name}: {key} time {value:.2f} over budget {budget} x {TIME_TOLERANCE}")
+    return failures
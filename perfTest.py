@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import unittest
+
+import numpy as np
+import pygame
+
+from body import Body
+from kinematicsCounters import CounterRecorder
+from loadHarness import createCrowd
+from perfBudgets import findOverBudget, loadBudgets, saveBudgets
+from rasterizer import getSectionsInDrawOrder
+from snapshot import restoreSnapshot, saveSnapshot
+from targetProviders import CircleTargetProvider, createCrowdProviders
+
+SURFACE_SIZE = (1000, 700)
+
+
+def calibrate(repeats: int = 5) -> float:
+    """
+    Times a fixed mix of Python float arithmetic and small NumPy calls, the kind of work the simulation does, so workload
+    timings can be compared across machines.
+    """
+    def work():
+        total = 0.0
+        for i in range(20000):
+            total += (i * 0.5) ** 0.5
+        points = np.arange(20.0).reshape(10, 2)
+        for _ in range(2000):
+            points = np.column_stack((points[:, 0] + 1, points[:, 1] * 0.5))
+        return total
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def runWorkload(create, ticks: int, surface: pygame.Surface, repeats: int = 2) -> dict:
+    """
+    Updates and draws freshly created bodies for a number of ticks, each following its own target provider. Counts come from
+    the last run, they are the same for every run of a seeded workload. Timings are the fastest of repeats runs.
+    """
+    updateTimes = []
+    displayTimes = []
+    for _ in range(repeats):
+        bodies = create()
+        recorder = CounterRecorder()
+        for i, body in enumerate(bodies):
+            recorder.attach(f"creature{i}", body)
+
+        updateTime = displayTime = 0.0
+        outlineSamples = 0
+        for _ in range(ticks):
+            start = time.perf_counter()
+            for body in bodies:
+                body.update(followMouse=True)
+            updateTime += time.perf_counter() - start
+            recorder.endTick()
+            outlineSamples += sum(len(section.curvePoints) for section in getSectionsInDrawOrder(bodies))
+
+            start = time.perf_counter()
+            surface.fill((50, 50, 60))
+            for body in bodies:
+                body.display(surface)
+            displayTime += time.perf_counter() - start
+        updateTimes.append(updateTime)
+        displayTimes.append(displayTime)
+
+    counts = recorder.totals()
+    counts["outlineSamples"] = outlineSamples
+    return {"counts": counts, "times": {"update": min(updateTimes), "display": min(displayTimes)}}
+
+
+def createExampleBody() -> list[Body]:
+    body = Body([], 25)
+    body.setExampleBody()
+    body.targetProvider = CircleTargetProvider((500, 350), 200)
+    return [body]
+
+
+def createExampleCrowd() -> list[Body]:
+    return createCrowd(createCrowdProviders("wander", 8, (0, 0) + SURFACE_SIZE, seed=0))
+
+
+def runSnapshotWorkload(repeats: int = 200) -> dict:
+    """
+    Times restoring a moved example body into an existing body and into a new one, against pickle.loads of the same body.
+    """
+    body = createExampleBody()[0]
+    for _ in range(60):
+        body.update(followMouse=True)
+    target = createExampleBody()[0]
+    data = saveSnapshot(body)
+    pickled = pickle.dumps(body)
+
+    def fastest(function) -> float:
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                function()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    return {"counts": {"snapshotBytes": len(data)},
+            "times": {"restoreInto": fastest(lambda: restoreSnapshot(data, target)),
+                      "restoreNew": fastest(lambda: restoreSnapshot(data)),
+                      "pickleLoads": fastest(lambda: pickle.loads(pickled))}}
+
+
+WORKLOADS = {
+    "exampleBody": (createExampleBody, 150),
+    "crowd": (createExampleCrowd, 60),
+}
+
+
+def initHeadless():
+    # Run without a display, e.g. on a plain Linux box or in CI
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+
+def measureWorkloads() -> dict:
+    surface = pygame.Surface(SURFACE_SIZE)
+    calibration = calibrate()
+    results = {}
+    for name, (create, ticks) in WORKLOADS.items():
+        results[name] = runWorkload(create, ticks, surface)
+    results["snapshot"] = runSnapshotWorkload()
+    for result in results.values():
+        result["normalizedTimes"] = {key: round(value / calibration, 2) for key, value in result.pop("times").items()}
+    return results
+
+
+class TestPerformance(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        initHeadless()
+        cls.results = measureWorkloads()
+
+    def test_within_budgets(self):
+        failures = findOverBudget(self.results, loadBudgets())
+        self.assertEqual(failures, [], "\n".join(failures))
+
+    def test_snapshot_restore_beats_pickle(self):
+        times = self.results["snapshot"]["normalizedTimes"]
+        self.assertLess(times["restoreInto"], times["pickleLoads"])
+        self.assertLess(times["restoreNew"], times["pickleLoads"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the seeded perf workloads and compare them against perf_budgets.json")
+    parser.add_argument("--update-budgets", action="store_true", help="Record the current measurements as the new budgets")
+    args, unittestArgs = parser.parse_known_args()
+
+    initHeadless()
+    if args.update_budgets:
+        results = measureWorkloads()
+        saveBudgets(results)
+        print(json.dumps(results, indent=4, sort_keys=True))
+        return
+    unittest.main(argv=[sys.argv[0]] + unittestArgs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import numpy as np
+
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+# Float type of CreatureBatch arrays, see setPrecision
+_dtype = np.float64
+
+
+def setPrecision(name: str):
+    """
+    Selects the float type new CreatureBatch arrays, and so the batched kinematics, use. float32 halves their memory
+    traffic for large crowds at the cost of precision. Bodies built from nodes always use Python floats, and batches that
+    already exist keep the type they were made with.
+    """
+    global _dtype
+    if name not in PRECISIONS:
+        raise ValueError(f"Unknown precision {name}, expected one of {list(PRECISIONS)}")
+    _dtype = PRECISIONS[name]
+
+
+def getPrecision() -> str:
+    return np.dtype(_dtype).name
+
+
+def getDtype() -> type:
+    return _dtype
@@ -0,0 +1,170 @@
+import argparse
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pygame
+
+from body import Body
+from legNode import LegNode
+from section import Section
+from targetProviders import PROVIDER_KINDS, createCrowdProviders
+
+
+def getSectionsInDrawOrder(bodies: list[Body]) -> list[Section]:
+    """
+    Returns every section in the order Body.display fills them: legs first, then the body on top.
+    """
+    sections: list[Section] = []
+    for body in bodies:
+        for node in body.nodes:
+            if isinstance(node, LegNode):
+                sections.extend(node.legs)
+        sections.append(body)
+    return sections
+
+
+def collectOutlines(sections: list[Section]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packs the curve points of all sections with finite outlines into one (m, 2) vertex array, an offsets array where polygon i owns
+    vertices[offsets[i]:offsets[i + 1]], and an (n, 3) array of fill colours from getCurrentColor.
+    """
+    outlines = []
+    colors = []
+    for section in sections:
+        if len(section.curvePoints) < 3:
+            continue
+        outline = np.asarray(section.curvePoints, dtype=np.float64).reshape(-1, 2)
+        # A non-finite vertex gives an odd number of crossings, which would shift the span pairing of every later polygon
+        if not np.isfinite(outline).all():
+            continue
+        outlines.append(outline)
+        color = section.getCurrentColor()
+        colors.append((color.r, color.g, color.b))
+
+    offsets = np.zeros(len(outlines) + 1, dtype=np.int64)
+    np.cumsum([len(outline) for outline in outlines], out=offsets[1:])
+    vertices = np.concatenate(outlines) if outlines else np.zeros((0, 2))
+    return vertices, offsets, np.array(colors, dtype=np.uint8).reshape(-1, 3)
+
+
+def fillPolygons(pixels: np.ndarray, vertices: np.ndarray, offsets: np.ndarray, colors: np.ndarray):
+    """
+    Scanline fills all polygons into a (width, height, 3) pixel array, as returned by pygame.surfarray.pixels3d, in a single
+    vectorized pass. Uses the even-odd rule with pixel centers at half coordinates. Later polygons are drawn over earlier ones.
+    """
+    width, height = pixels.shape[0], pixels.shape[1]
+    polygonCount = len(offsets) - 1
+    if polygonCount <= 0:
+        return
+
+    # Build every edge as (start vertex, end vertex), closing each polygon back onto its first vertex
+    counts = np.diff(offsets)
+    polygonOfVertex = np.repeat(np.arange(polygonCount), counts)
+    nextVertex = np.arange(len(vertices)) + 1
+    nextVertex[offsets[1:] - 1] = offsets[:-1]
+    x0, y0 = vertices[:, 0], vertices[:, 1]
+    x1, y1 = vertices[nextVertex, 0], vertices[nextVertex, 1]
+
+    # Rows whose center lies in [yMin, yMax) are crossed by the edge, so shared vertices are counted once
+    yMin = np.minimum(y0, y1)
+    yMax = np.maximum(y0, y1)
+    rowStart = np.clip(np.ceil(yMin - 0.5), 0, height).astype(np.int64)
+    rowEnd = np.clip(np.ceil(yMax - 0.5), 0, height).astype(np.int64)
+    rowCounts = np.maximum(rowEnd - rowStart, 0)
+    rowCounts[y0 == y1] = 0
+
+    edge = np.repeat(np.arange(len(vertices)), rowCounts)
+    if len(edge) == 0:
+        return
+    firstCrossing = np.cumsum(rowCounts) - rowCounts
+    row = rowStart[edge] + np.arange(len(edge)) - np.repeat(firstCrossing, rowCounts)
+    crossingX = x0[edge] + (row + 0.5 - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+    polygon = polygonOfVertex[edge]
+
+    # Sorting by polygon, row and x lines up the crossings of each scanline in pairs
+    order = np.lexsort((crossingX, row, polygon))
+    crossingX, row, polygon = crossingX[order], row[order], polygon[order]
+    spanStart = np.clip(np.ceil(crossingX[0::2] - 0.5), 0, width).astype(np.int64)
+    spanEnd = np.clip(np.ceil(crossingX[1::2] - 0.5), 0, width).astype(np.int64)
+    spanRow = row[0::2]
+    spanPolygon = polygon[0::2]
+    spanLengths = np.maximum(spanEnd - spanStart, 0)
+
+    # Expand spans to pixels and keep the topmost polygon where they overlap
+    span = np.repeat(np.arange(len(spanStart)), spanLengths)
+    firstPixel = np.cumsum(spanLengths) - spanLengths
+    pixelX = spanStart[span] + np.arange(len(span)) - np.repeat(firstPixel, spanLengths)
+    pixelY = spanRow[span]
+    pixelPolygon = spanPolygon[span]
+    pixelIndex = pixelX * height + pixelY
+    order = np.lexsort((pixelPolygon, pixelIndex))
+    topmost = np.ones(len(order), dtype=bool)
+    topmost[:-1] = pixelIndex[order][1:] != pixelIndex[order][:-1]
+    order = order[topmost]
+
+    pixels[pixelX[order], pixelY[order]] = colors[pixelPolygon[order]]
+
+
+def rasterizeBodies(pixels: np.ndarray, bodies: list[Body], background: Optional[Tuple[int, int, int]] = None):
+    if background is not None:
+        pixels[:] = background
+    vertices, offsets, colors = collectOutlines(getSectionsInDrawOrder(bodies))
+    fillPolygons(pixels, vertices, offsets, colors)
+
+
+def rasterizeBodiesToSurface(screen: pygame.Surface, bodies: list[Body], background: Optional[Tuple[int, int, int]] = None):
+    """
+    Fills the outlines of all bodies straight into the pixels of a pygame surface.
+    """
+    pixels = pygame.surfarray.pixels3d(screen)
+    try:
+        rasterizeBodies(pixels, bodies, background)
+    finally:
+        del pixels
+
+
+def rasterizeBodiesToArray(bodies: list[Body], size: Tuple[int, int],
+                           background: Tuple[int, int, int] = (50, 50, 60)) -> np.ndarray:
+    """
+    Renders bodies into a new (width, height, 3) uint8 array without needing a display. Use pygame.surfarray.make_surface
+    to turn the result into a surface for saving.
+    """
+    pixels = np.empty((size[0], size[1], 3), dtype=np.uint8)
+    rasterizeBodies(pixels, bodies, background)
+    return pixels
+
+
+def saveFrame(bodies: list[Body], size: Tuple[int, int], path: str, background: Tuple[int, int, int] = (50, 50, 60)):
+    """
+    Rasterizes bodies and writes the frame to an image file, without a display.
+    """
+    pygame.image.save(pygame.surfarray.make_surface(rasterizeBodiesToArray(bodies, size, background)), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a crowd of example creatures to image files without a display")
+    parser.add_argument("--creatures", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=700)
+    parser.add_argument("--out", default="frames")
+    parser.add_argument("--targets", choices=PROVIDER_KINDS, default="circle")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Only the command line needs the load harness, so rendering does not pull it in
+    from loadHarness import createCrowd
+
+    os.makedirs(args.out, exist_ok=True)
+    providers = createCrowdProviders(args.targets, args.creatures, (0, 0, args.width, args.height), args.seed)
+    bodies = createCrowd(providers)
+
+    for frame in range(args.frames):
+        for body in bodies:
+            body.update(followMouse=True)
+        saveFrame(bodies, (args.width, args.height), os.path.join(args.out, f"frame{frame:05d}.png"))
+
+
+if __name__ == "__main__":
+    main()
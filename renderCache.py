@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pygame
+
+
+class RenderCache:
+    def __init__(self, maxSize: int = 512):
+        """
+        Keeps fonts, rendered text and pre-rendered circle sprites so overlays can blit them instead of rasterizing every frame.
+        The least recently used entry is evicted once more than maxSize entries are cached.
+        """
+        self.maxSize = maxSize
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, create):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = create()
+        self.entries[key] = entry
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+
+    def getFont(self, name: Optional[str], size: int) -> pygame.font.Font:
+        return self.get(("font", name, size), lambda: pygame.font.Font(name, size))
+
+    def getText(self, text: str, size: int, color, fontName: Optional[str] = None) -> pygame.Surface:
+        color = pygame.color.Color(color)
+        return self.get(("text", text, size, tuple(color), fontName),
+                        lambda: self.getFont(fontName, size).render(text, True, color))
+
+    def getCircle(self, radius: int, width: int, color) -> pygame.Surface:
+        """
+        Returns a sprite of the circle pygame.draw.circle would draw for this radius and width, centered at (radius + 1, radius + 1).
+        """
+        color = pygame.color.Color(color)
+
+        def create():
+            sprite = pygame.Surface((radius * 2 + 2, radius * 2 + 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (radius + 1, radius + 1), radius, width)
+            return sprite
+
+        return self.get(("circle", radius, width, tuple(color)), create)
+
+    def drawCircle(self, screen: pygame.Surface, color, center: Tuple[float, float], radius: float, width: int = 0):
+        """
+        Drop-in replacement for pygame.draw.circle that blits a cached sprite.
+        """
+        radius = int(radius)
+        if radius < 1:
+            return
+        sprite = self.getCircle(radius, width, color)
+        # pygame.draw.circle truncates float centers, so do the same to land on identical pixels
+        screen.blit(sprite, (int(center[0]) - radius - 1, int(center[1]) - radius - 1))
+
+
+defaultRenderCache = RenderCache()
+
+
+def getFont(name: Optional[str], size: int) -> pygame.font.Font:
+    return defaultRenderCache.getFont(name, size)
+
+
+def getText(text: str, size: int, color, fontName: Optional[str] = None) -> pygame.Surface:
+    return defaultRenderCache.getText(text, size, color, fontName)
+
+
+def drawCircle(screen: pygame.Surface, color, center: Tuple[float, float], radius: float, width: int = 0):
+    defaultRenderCache.drawCircle(screen, color, center, radius, width)
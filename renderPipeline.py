@@ -0,0 +1,112 @@
+import copy
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from body import Body
+from legNode import LegNode
+from section import Section
+
+
+def cloneSection(section: Section) -> Section:
+    """
+    Shallow copy of a section with its own nodes. Lateral and curve points are shared, which is safe because updates
+    replace them instead of mutating them in place.
+    """
+    clone = copy.copy(section)
+    clonedNodes = {}
+    clone.nodes = []
+    for node in section.nodes:
+        clonedNode = copy.copy(node)
+        clonedNode.prevNode = clonedNodes.get(id(node.prevNode), node.prevNode)
+        clonedNodes[id(node)] = clonedNode
+        clone.nodes.append(clonedNode)
+    return clone
+
+
+def cloneBody(body: Body) -> Body:
+    clone = cloneSection(body)
+    for node in clone.nodes:
+        if isinstance(node, LegNode):
+            node.legs = [cloneSection(leg) for leg in node.legs]
+            for leg in node.legs:
+                leg.attachedNode = node
+            node.currentTargets = list(node.currentTargets)
+    return clone
+
+
+def copySectionState(source: Section, destination: Section):
+    for sourceNode, node in zip(source.nodes, destination.nodes):
+        node.x, node.y, node.size = sourceNode.x, sourceNode.y, sourceNode.size
+    destination.lateralPoints = source.lateralPoints
+    destination.curvePoints = source.curvePoints
+    destination.colors = source.colors
+    destination.currentColorIndex = source.currentColorIndex
+
+
+def sameTopology(body: Body, other: Body) -> bool:
+    if len(body.nodes) != len(other.nodes):
+        return False
+    for node, otherNode in zip(body.nodes, other.nodes):
+        if isinstance(node, LegNode) != isinstance(otherNode, LegNode):
+            return False
+        if isinstance(node, LegNode):
+            if len(node.legs) != len(otherNode.legs):
+                return False
+            for leg, otherLeg in zip(node.legs, otherNode.legs):
+                if len(leg.nodes) != len(otherLeg.nodes):
+                    return False
+    return True
+
+
+class RenderBuffer:
+    def __init__(self):
+        """
+        Reusable render copy of a body. Capturing refreshes the copy in place when the topology has not changed.
+        """
+        self.body: Optional[Body] = None
+
+    def capture(self, body: Body) -> Body:
+        if self.body is None or not sameTopology(body, self.body):
+            self.body = cloneBody(body)
+            return self.body
+
+        copySectionState(body, self.body)
+        for sourceNode, node in zip(body.nodes, self.body.nodes):
+            if isinstance(sourceNode, LegNode):
+                node.targets = sourceNode.targets
+                node.currentTargets[:] = sourceNode.currentTargets
+                node.updateDistance = sourceNode.updateDistance
+                for sourceLeg, leg in zip(sourceNode.legs, node.legs):
+                    copySectionState(sourceLeg, leg)
+        return self.body
+
+
+class RenderPipeline:
+    def __init__(self):
+        """
+        Overlaps the update of tick N+1 on a worker thread with drawing tick N on the calling thread.
+        Drawing reads a render copy of the body, so it never sees a half-updated tick. Experimental, the update is mostly
+        GIL bound Python, so only the parts that release the GIL (NumPy, SciPy, pygame drawing) can overlap.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="RenderPipeline")
+        self.buffer = RenderBuffer()
+        self.pending: Optional[Future] = None
+
+    def capture(self, body: Body) -> Body:
+        """
+        Copies the current tick into the render buffer. Must be called while no update is in flight and after the previous
+        frame has been drawn, so a single buffer is enough.
+        """
+        return self.buffer.capture(body)
+
+    def startUpdate(self, body: Body, followMouse: bool, target: Optional[Tuple[int, int]] = None):
+        self.pending = self.executor.submit(body.update, followMouse, target)
+
+    def finishUpdate(self):
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.result()
+
+    def close(self):
+        self.finishUpdate()
+        self.executor.shutdown()
@@ -3,6 +3,7 @@ from constants import BLUE, GREEN, RED
 from inverseKinematicsHandler import InverseKinematicsHandler
 from kinematicsHandler import KinematicsHandler
 from node import Node
+from renderCache import drawCircle
 import pygame
 from scipy.interpolate import CubicSpline
 import numpy as np
@@ -14,6 +15,8 @@ class Section:
         """
         self.nodes: list[Node] = nodes
         self.kinematicsHandler = InverseKinematicsHandler(1.0, node_spacing)
+        # Optional outlineSampling.AdaptiveOutlineSampler, None samples outlines uniformly
+        self.outlineSampler = None
         self.lateralPoints = self.getLateralSetPointList()
         self.curvePoints = self.getParametricCurvePoints()
         self.colors = [BLUE, RED, GREEN]
@@ -33,6 +36,17 @@ class Section:
     def updateCurvePoints(self):
         self.curvePoints = self.getParametricCurvePoints()
 
+    @property
+    def curvePoints(self):
+        # None marks the outline as stale, e.g. after a snapshot restore, and it is rebuilt on first use
+        if self._curvePoints is None:
+            self._curvePoints = self.getParametricCurvePoints()
+        return self._curvePoints
+
+    @curvePoints.setter
+    def curvePoints(self, points):
+        self._curvePoints = points
+
     def applyDistanceConstraint(self):
         self.kinematicsHandler.applyForwardsDistanceConstraint(self.nodes)
 
@@ -99,7 +113,7 @@ class Section:
                     lateralPoints.append(point)
                 points.append(lateralPoints)
 
-        return points
+        return np.array(points, dtype=np.float64)
 
     def getParametricCurvePoints(self):
         # Return empty if no lateral points
@@ -144,13 +158,14 @@ class Section:
         y_spline = CubicSpline(t_points, y_points)  
 
         # Generate parameterized values for t
-        t_values = np.linspace(0, 1, 500)  # Smooth curve with 1000 points
-        curve_points = []
-        for t in t_values:
-            if t > start_t and t < end_t:
-                curve_points.append([x_spline(t), y_spline(t)])
+        if self.outlineSampler is not None:
+            t_values = self.outlineSampler.sampleTimes(x_spline, y_spline, start_t, end_t)
+        else:
+            t_values = np.linspace(0, 1, 500)  # Smooth curve with 1000 points
+            t_values = t_values[(t_values > start_t) & (t_values < end_t)]
 
-        return curve_points
+        # Evaluate all samples in one call per spline
+        return np.column_stack((x_spline(t_values), y_spline(t_values)))
     
     def getTotalLength(self):
         return self.node_spacing * (len(self.nodes)-1)
@@ -196,11 +211,11 @@ class Section:
     def displayLateralPoints(self, screen: pygame.Surface):
         for lateralPointSet in self.lateralPoints:
             for point in lateralPointSet:
-                pygame.draw.circle(screen, pygame.color.Color(150, 140, 130), (point[0], point[1]), 5, 3)
+                drawCircle(screen, pygame.color.Color(150, 140, 130), (point[0], point[1]), 5, 3)
             # Right point
-            pygame.draw.circle(screen, pygame.color.Color(255, 0, 0), (lateralPointSet[0][0], lateralPointSet[0][1]), 5, 3)
+            drawCircle(screen, pygame.color.Color(255, 0, 0), (lateralPointSet[0][0], lateralPointSet[0][1]), 5, 3)
             # Left point
-            pygame.draw.circle(screen, pygame.color.Color(0, 0, 255), (lateralPointSet[1][0], lateralPointSet[1][1]), 5, 3)
+            drawCircle(screen, pygame.color.Color(0, 0, 255), (lateralPointSet[1][0], lateralPointSet[1][1]), 5, 3)
 
     def displayLinesBetweenNodes(self, screen: pygame.Surface):
         """
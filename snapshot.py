@@ -0,0 +1,223 @@
+import struct
+from typing import Optional
+
+import numpy as np
+import pygame
+
+from body import Body
+from leg import Leg
+from legNode import LegNode
+from node import Node
+from section import Section
+
+SNAPSHOT_MAGIC = b"PANS"
+SNAPSHOT_VERSION = 4
+
+# Magic, version, number of layout ints, number of state floats
+SNAPSHOT_HEADER = struct.Struct("<4sHII")
+
+NODE = 0
+LEG_NODE = 1
+
+# Per section state header: colour index, node spacing, error margin, FABRIK iteration cap, lateral point sets
+SECTION_HEADER_SIZE = 5
+LATERAL_POINTS_PER_SET = 10
+
+
+def writeSection(section: Section, layout: list[int], state: list[np.ndarray]):
+    layout.append(len(section.nodes))
+    layout.append(len(section.colors))
+    for color in section.colors:
+        layout.extend((color.r, color.g, color.b, color.a))
+    lateralPoints = np.asarray(section.lateralPoints, dtype=np.float64).reshape(-1)
+    state.append(np.array([section.currentColorIndex,
+                           section.kinematicsHandler.node_spacing,
+                           section.kinematicsHandler.errorMargin,
+                           section.kinematicsHandler.maxIterations,
+                           len(lateralPoints) // (LATERAL_POINTS_PER_SET * 2)]))
+    state.append(np.array([(node.x, node.y, node.size) for node in section.nodes], dtype=np.float64).reshape(-1))
+    # Lateral points are cheap to store, curve outlines are rebuilt from them when first drawn
+    state.append(lateralPoints)
+
+
+def writeBody(body: Body, layout: list[int], state: list[np.ndarray]):
+    writeSection(body, layout, state)
+    for node in body.nodes:
+        if isinstance(node, LegNode):
+            layout.append(LEG_NODE)
+            layout.append(len(node.legs))
+            state.append(np.array([node.updateDistance]))
+            state.append(np.asarray(node.targets, dtype=np.float64).reshape(-1))
+            state.append(np.asarray(node.currentTargets, dtype=np.float64).reshape(-1))
+            for leg in node.legs:
+                writeSection(leg, layout, state)
+        else:
+            layout.append(NODE)
+
+
+def getSnapshotArrays(body: Body) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the topology of a body as an int32 array and all of its numeric state, including lateral points, as a float64
+    array.
+    """
+    layout: list[int] = []
+    state: list[np.ndarray] = []
+    writeBody(body, layout, state)
+    return np.array(layout, dtype="<i4"), np.concatenate(state).astype("<f8", copy=False)
+
+
+def getSnapshotLayout(body: Body) -> np.ndarray:
+    layout: list[int] = []
+    writeLayout(body, layout)
+    return np.array(layout, dtype="<i4")
+
+
+def writeLayout(body: Body, layout: list[int]):
+    def writeSectionLayout(section: Section):
+        layout.append(len(section.nodes))
+        layout.append(len(section.colors))
+        for color in section.colors:
+            layout.extend((color.r, color.g, color.b, color.a))
+
+    writeSectionLayout(body)
+    for node in body.nodes:
+        if isinstance(node, LegNode):
+            layout.append(LEG_NODE)
+            layout.append(len(node.legs))
+            for leg in node.legs:
+                writeSectionLayout(leg)
+        else:
+            layout.append(NODE)
+
+
+def saveSnapshot(body: Body) -> bytes:
+    """
+    Serializes a body, its legs, leg targets, kinematics parameters, colour state and derived outline points into a
+    compact binary snapshot.
+    """
+    layout, state = getSnapshotArrays(body)
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(layout), len(state))
+    return header + layout.tobytes() + state.tobytes()
+
+
+def readSnapshotArrays(data: bytes) -> tuple[np.ndarray, np.ndarray]:
+    magic, version, layoutCount, stateCount = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Data is not a body snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    offset = SNAPSHOT_HEADER.size
+    layout = np.frombuffer(data, dtype="<i4", count=layoutCount, offset=offset)
+    # One copy of the state, so restored point arrays can be views into it without holding on to read-only bytes
+    state = np.frombuffer(data, dtype="<f8", count=stateCount, offset=offset + layout.nbytes).astype(np.float64)
+    return layout, state
+
+
+class SnapshotReader:
+    def __init__(self, layout: np.ndarray, state: np.ndarray):
+        """
+        Walks snapshot arrays in the order they were written.
+        """
+        self.layout = layout.tolist()
+        self.state = state
+        self.layoutIndex = 0
+        self.stateIndex = 0
+        self.colors: dict[tuple[int, ...], pygame.Color] = {}
+
+    def readInts(self, count: int = 1) -> list[int]:
+        values = self.layout[self.layoutIndex:self.layoutIndex + count]
+        self.layoutIndex += count
+        return values
+
+    def readFloats(self, count: int = 1) -> np.ndarray:
+        values = self.state[self.stateIndex:self.stateIndex + count]
+        self.stateIndex += count
+        return values
+
+    def readSectionState(self, section: Section, nodeCount: int) -> list[list[float]]:
+        """
+        Reads a section's parameters and lateral points into it, marks its outline stale and returns its node positions and
+        sizes.
+        """
+        colorIndex, nodeSpacing, errorMargin, maxIterations, lateralSets = self.readFloats(SECTION_HEADER_SIZE).tolist()
+        section.currentColorIndex = int(colorIndex)
+        section.kinematicsHandler.node_spacing = nodeSpacing
+        section.kinematicsHandler.errorMargin = errorMargin
+        section.kinematicsHandler.maxIterations = int(maxIterations)
+        positions = self.readFloats(nodeCount * 3).reshape(-1, 3).tolist()
+        lateralPoints = self.readFloats(int(lateralSets) * LATERAL_POINTS_PER_SET * 2)
+        section.lateralPoints = lateralPoints.reshape(-1, LATERAL_POINTS_PER_SET, 2)
+        section.curvePoints = None
+        return positions
+
+    def readSection(self, section: Section):
+        nodeCount, colorCount = self.readInts(2)
+        colors = self.readInts(colorCount * 4)
+        section.colors = [self.getColor(tuple(colors[i:i + 4])) for i in range(0, len(colors), 4)]
+        positions = self.readSectionState(section, nodeCount)
+        section.nodes = []
+        prevNode = None
+        for x, y, size in positions:
+            prevNode = Node(x, y, size, prevNode)
+            section.nodes.append(prevNode)
+
+    def getColor(self, rgba: tuple[int, ...]) -> pygame.Color:
+        # Sections share their colour objects, like the constants they are built from
+        if rgba not in self.colors:
+            self.colors[rgba] = pygame.color.Color(*rgba)
+        return self.colors[rgba]
+
+    def readLegNodeState(self, node: LegNode, legCount: int):
+        node.updateDistance = float(self.readFloats()[0])
+        node.targets = self.readFloats(legCount * 2).reshape(-1, 2).tolist()
+        node.currentTargets = self.readFloats(legCount * 2).reshape(-1, 2).tolist()
+
+    def readBody(self) -> Body:
+        body = Body([], 0)
+        self.readSection(body)
+        for i, node in enumerate(body.nodes):
+            (kind,) = self.readInts()
+            if kind != LEG_NODE:
+                continue
+            if i == 0:
+                raise ValueError("Snapshot has a LegNode as anchor node, which bodies do not support")
+            (legCount,) = self.readInts()
+            legNode = LegNode(node.x, node.y, node.size, node.prevNode, 0, [], [])
+            self.readLegNodeState(legNode, legCount)
+            for _ in range(legCount):
+                leg = Leg([], 0, legNode)
+                self.readSection(leg)
+                legNode.legs.append(leg)
+            body.nodes[i] = legNode
+            if i + 1 < len(body.nodes):
+                body.nodes[i + 1].prevNode = legNode
+        return body
+
+    def readInto(self, body: Body):
+        """
+        Copies state into a body that already has the snapshot's topology, without rebuilding any nodes.
+        """
+        self.readSectionInto(body)
+        for node in body.nodes:
+            if isinstance(node, LegNode):
+                self.readLegNodeState(node, len(node.legs))
+                for leg in node.legs:
+                    self.readSectionInto(leg)
+
+    def readSectionInto(self, section: Section):
+        positions = self.readSectionState(section, len(section.nodes))
+        for node, (x, y, size) in zip(section.nodes, positions):
+            node.x, node.y, node.size = x, y, size
+
+
+def restoreSnapshot(data: bytes, body: Optional[Body] = None) -> Body:
+    """
+    Restores a body from a snapshot. When a body with the same topology and colours is given, its nodes are reused and only the
+    numeric state is copied, otherwise a new body is built.
+    """
+    layout, state = readSnapshotArrays(data)
+    reader = SnapshotReader(layout, state)
+    if body is not None and np.array_equal(getSnapshotLayout(body), layout):
+        reader.readInto(body)
+        return body
+    return reader.readBody()
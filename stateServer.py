@@ -0,0 +1,283 @@
+import asyncio
+import socket
+import struct
+import threading
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from body import Body
+from legNode import LegNode
+
+KEYFRAME = 0
+DELTA = 1
+
+# Positions are sent as fixed point values with 1/16 pixel resolution
+QUANTIZATION_SCALE = 16.0
+
+LENGTH_PREFIX = struct.Struct("<I")
+FRAME_HEADER = struct.Struct("<BII")  # Frame type, tick, number of points
+
+
+def getBodyState(body: Body) -> np.ndarray:
+    """
+    Flattens the positions of a body into an (n, 2) array: body nodes, then for every LegNode the nodes of each leg followed by its currentTargets.
+    """
+    points = [[node.x, node.y] for node in body.nodes]
+    for node in body.nodes:
+        if isinstance(node, LegNode):
+            for leg in node.legs:
+                points.extend([legNode.x, legNode.y] for legNode in leg.nodes)
+            points.extend([target[0], target[1]] for target in node.currentTargets)
+    return np.array(points, dtype=np.float64).reshape(-1, 2)
+
+
+def applyBodyState(body: Body, positions: np.ndarray):
+    """
+    Writes positions produced by getBodyState back onto a body with the same topology and refreshes its lateral and curve points.
+    """
+    index = 0
+    for node in body.nodes:
+        node.x, node.y = float(positions[index][0]), float(positions[index][1])
+        index += 1
+    for node in body.nodes:
+        if isinstance(node, LegNode):
+            for leg in node.legs:
+                for legNode in leg.nodes:
+                    legNode.x, legNode.y = float(positions[index][0]), float(positions[index][1])
+                    index += 1
+                leg.updateLateralPointSetPositions()
+                leg.updateCurvePoints()
+            for i in range(len(node.currentTargets)):
+                node.currentTargets[i] = [float(positions[index][0]), float(positions[index][1])]
+                index += 1
+    if index != len(positions):
+        raise ValueError(f"State has {len(positions)} points but body layout expects {index}")
+    body.updateLateralPointSetPositions()
+    body.updateCurvePoints()
+
+
+class StateEncoder:
+    def __init__(self, keyframeInterval: int = 60):
+        """
+        Encodes position frames as quantized keyframes or int16 deltas against the previously encoded frame.
+        """
+        self.keyframeInterval = keyframeInterval
+        self.previous: Optional[np.ndarray] = None
+        self.framesSinceKeyframe = 0
+
+    def encode(self, tick: int, positions: np.ndarray) -> bytes:
+        quantized = np.round(np.asarray(positions, dtype=np.float64) * QUANTIZATION_SCALE).astype(np.int32)
+        frameType = KEYFRAME
+        if (self.previous is not None
+                and self.previous.shape == quantized.shape
+                and self.framesSinceKeyframe < self.keyframeInterval):
+            delta = quantized - self.previous
+            if np.abs(delta).max(initial=0) <= np.iinfo(np.int16).max:
+                frameType = DELTA
+
+        if frameType == KEYFRAME:
+            payload = quantized.astype("<i4").tobytes()
+            self.framesSinceKeyframe = 0
+        else:
+            payload = delta.astype("<i2").tobytes()
+            self.framesSinceKeyframe += 1
+
+        self.previous = quantized
+        return FRAME_HEADER.pack(frameType, tick, len(quantized)) + payload
+
+
+class StateDecoder:
+    def __init__(self):
+        """
+        Rebuilds position frames from the output of StateEncoder.
+        """
+        self.previous: Optional[np.ndarray] = None
+
+    def decode(self, frame: bytes) -> Tuple[int, np.ndarray]:
+        frameType, tick, count = FRAME_HEADER.unpack_from(frame)
+        data = frame[FRAME_HEADER.size:]
+        if frameType == KEYFRAME:
+            quantized = np.frombuffer(data, dtype="<i4").astype(np.int32).reshape(count, 2)
+        elif frameType == DELTA:
+            if self.previous is None or len(self.previous) != count:
+                raise ValueError("Received delta frame without a matching keyframe")
+            quantized = self.previous + np.frombuffer(data, dtype="<i2").reshape(count, 2)
+        else:
+            raise ValueError(f"Unknown frame type {frameType}")
+        self.previous = quantized
+        return tick, quantized / QUANTIZATION_SCALE
+
+
+class ClientConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, keyframeInterval: int):
+        """
+        Holds only the newest unsent frame for one client so a slow reader skips frames instead of stalling the simulation.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.encoder = StateEncoder(keyframeInterval)
+        self.pending: Optional[Tuple[int, np.ndarray]] = None
+        self.ready = asyncio.Event()
+        self.closing = False
+        self.droppedFrames = 0
+        self.sentFrames = 0
+
+    def offer(self, tick: int, positions: np.ndarray):
+        if self.pending is not None:
+            self.droppedFrames += 1
+        self.pending = (tick, positions)
+        self.ready.set()
+
+    def close(self):
+        """
+        Makes run return. Unsent data is discarded, so a client that stopped reading cannot hold up the shutdown.
+        """
+        self.closing = True
+        self.ready.set()
+        self.writer.transport.abort()
+
+    async def run(self):
+        # Viewers never send anything, so the read only finishes once the client disconnects
+        disconnected = asyncio.ensure_future(self.reader.read())
+        try:
+            while not self.closing:
+                ready = asyncio.ensure_future(self.ready.wait())
+                await asyncio.wait([ready, disconnected], return_when=asyncio.FIRST_COMPLETED)
+                if not ready.done():
+                    ready.cancel()
+                    break
+                self.ready.clear()
+                if self.closing or self.pending is None:
+                    continue
+                tick, positions = self.pending
+                self.pending = None
+                # Deltas are taken against the last frame this client received, so dropped frames never corrupt its state
+                frame = self.encoder.encode(tick, positions)
+                self.writer.write(LENGTH_PREFIX.pack(len(frame)) + frame)
+                await self.writer.drain()
+                self.sentFrames += 1
+        except ConnectionError:
+            pass
+        finally:
+            disconnected.cancel()
+            self.writer.close()
+
+
+class StateServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None,
+                 keyframeInterval: int = 60):
+        """
+        Publishes simulation frames to any number of local viewers. Runs its own asyncio loop on a background thread,
+        so publishing from the pygame loop never blocks. Listens on a Unix domain socket when path is given, otherwise on host:port.
+        """
+        self.host = host
+        self.port = port
+        self.path = path
+        self.keyframeInterval = keyframeInterval
+        self.clients: list[ClientConnection] = []
+        self.clientConnected = threading.Event()
+        self.tick = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.listen())
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=serve, name="StateServer", daemon=True)
+        self.thread.start()
+        started.wait()
+
+    async def listen(self):
+        if self.path is not None:
+            self.server = await asyncio.start_unix_server(self.handleClient, path=self.path)
+        else:
+            self.server = await asyncio.start_server(self.handleClient, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = ClientConnection(reader, writer, self.keyframeInterval)
+        self.clients.append(client)
+        self.clientConnected.set()
+        try:
+            await client.run()
+        finally:
+            self.clients.remove(client)
+
+    def publish(self, positions: np.ndarray):
+        if self.loop is None:
+            raise RuntimeError("StateServer.publish called before start()")
+        self.tick += 1
+        self.loop.call_soon_threadsafe(self.broadcast, self.tick, np.array(positions, dtype=np.float64))
+
+    def publishBody(self, body: Body):
+        self.publish(getBodyState(body))
+
+    def broadcast(self, tick: int, positions: np.ndarray):
+        for client in self.clients:
+            client.offer(tick, positions)
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        async def shutdown():
+            self.server.close()
+            handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            # Let every client handler return on its own instead of cancelling it
+            for client in list(self.clients):
+                client.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+
+
+class StateClient:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """
+        Blocking reader for a StateServer stream. With a timeout, reads raise TimeoutError when no frame arrives in time.
+        """
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.decoder = StateDecoder()
+
+    def readExactly(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("State server closed the connection")
+            data.extend(chunk)
+        return bytes(data)
+
+    def readFrame(self) -> Tuple[int, np.ndarray]:
+        (length,) = LENGTH_PREFIX.unpack(self.readExactly(LENGTH_PREFIX.size))
+        return self.decoder.decode(self.readExactly(length))
+
+    def frames(self) -> Iterator[Tuple[int, np.ndarray]]:
+        try:
+            while True:
+                yield self.readFrame()
+        except ConnectionError:
+            return
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,82 @@
+import argparse
+import threading
+
+import pygame
+from body import Body
+from stateServer import StateClient, applyBodyState
+
+SCREEN_WIDTH = 1000
+SCREEN_HEIGHT = 700
+
+
+class StateViewer:
+    def __init__(self, client: StateClient):
+        """
+        Renders a StateServer stream with the regular display methods. Frames are read on a background thread and only the newest one is drawn.
+        """
+        self.client = client
+        self.body = Body([], 25)
+        self.body.setExampleBody()
+        self.latest = None
+        self.lock = threading.Lock()
+        self.running = True
+        self.displayParametric = True
+        self.displayCircles = False
+
+    def receive(self):
+        for frame in self.client.frames():
+            with self.lock:
+                self.latest = frame
+        self.running = False
+
+    def handleKeyBoardInput(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_3:
+                    self.displayParametric = not self.displayParametric
+                elif event.key == pygame.K_1:
+                    self.displayCircles = not self.displayCircles
+                elif event.key == pygame.K_SPACE:
+                    self.body.switchColor()
+
+    def draw(self, screen: pygame.Surface):
+        screen.fill(pygame.color.Color(50, 50, 60))
+        if self.displayCircles:
+            self.body.displayNodes(screen)
+        if self.displayParametric:
+            self.body.display(screen)
+
+    def run(self):
+        pygame.init()
+        pygame.display.set_caption("Procedural Generation Viewer")
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags=pygame.RESIZABLE)
+        clock = pygame.time.Clock()
+        threading.Thread(target=self.receive, daemon=True).start()
+
+        while self.running:
+            with self.lock:
+                frame, self.latest = self.latest, None
+            if frame is not None:
+                applyBodyState(self.body, frame[1])
+            self.draw(screen)
+            self.handleKeyBoardInput()
+            pygame.display.flip()
+            clock.tick(60)
+
+        self.client.close()
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a simulation published with main.py --serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Unix domain socket path")
+    args = parser.parse_args()
+    StateViewer(StateClient(args.host, args.port, args.unix)).run()
+
+
+if __name__ == "__main__":
+    main()
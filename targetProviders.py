@@ -0,0 +1,190 @@
+import json
+from typing import Optional, Tuple
+
+import numpy as np
+import pygame
+
+Coordinate = Tuple[float, float]
+Bounds = Tuple[float, float, float, float]  # Left, top, right, bottom
+
+
+class TargetProvider:
+    """
+    Supplies the point a body's head follows, one point per tick.
+    """
+
+    def nextTarget(self) -> Coordinate:
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+
+class MouseTargetProvider(TargetProvider):
+    def nextTarget(self) -> Coordinate:
+        return pygame.mouse.get_pos()
+
+
+class RecordedTargetProvider(TargetProvider):
+    def __init__(self, points: list[Coordinate], loop: bool = True):
+        """
+        Replays a recorded trace. Without looping, the last point is held once the trace runs out.
+        """
+        if len(points) == 0:
+            raise ValueError("Recorded trace is empty")
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.loop = loop
+        self.tick = 0
+
+    @classmethod
+    def fromFile(cls, path: str, loop: bool = True) -> 'RecordedTargetProvider':
+        with open(path) as file:
+            return cls(json.load(file), loop)
+
+    def nextTarget(self) -> Coordinate:
+        if self.loop:
+            point = self.points[self.tick % len(self.points)]
+        else:
+            point = self.points[min(self.tick, len(self.points) - 1)]
+        self.tick += 1
+        return point
+
+    def reset(self):
+        self.tick = 0
+
+
+class TraceRecorder(TargetProvider):
+    def __init__(self, provider: TargetProvider):
+        """
+        Passes targets through from another provider, e.g. the mouse, and keeps them so they can be saved and replayed.
+        """
+        self.provider = provider
+        self.points: list[Coordinate] = []
+
+    def nextTarget(self) -> Coordinate:
+        point = self.provider.nextTarget()
+        self.points.append((float(point[0]), float(point[1])))
+        return point
+
+    def save(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.points, file)
+
+
+class CircleTargetProvider(TargetProvider):
+    def __init__(self, center: Coordinate, radius: float, period: int = 240, phase: float = 0):
+        """
+        Moves around a circle once every period ticks.
+        """
+        self.center = center
+        self.radius = radius
+        self.period = period
+        self.phase = phase
+        self.tick = 0
+
+    def nextTarget(self) -> Coordinate:
+        angle = self.phase + 2 * np.pi * self.tick / self.period
+        self.tick += 1
+        return (self.center[0] + self.radius * np.cos(angle), self.center[1] + self.radius * np.sin(angle))
+
+    def reset(self):
+        self.tick = 0
+
+
+class FigureEightTargetProvider(CircleTargetProvider):
+    def __init__(self, center: Coordinate, width: float, height: float, period: int = 360, phase: float = 0):
+        """
+        Traces a figure-eight (a Lissajous curve with a 1:2 frequency ratio) once every period ticks.
+        """
+        super().__init__(center, width / 2, period, phase)
+        self.height = height
+
+    def nextTarget(self) -> Coordinate:
+        angle = self.phase + 2 * np.pi * self.tick / self.period
+        self.tick += 1
+        return (self.center[0] + self.radius * np.sin(angle), self.center[1] + self.height / 2 * np.sin(2 * angle))
+
+
+class RandomWalkTargetProvider(TargetProvider):
+    def __init__(self, start: Coordinate, stepSize: float, bounds: Bounds, seed: int = 0):
+        """
+        Takes a seeded random step of up to stepSize each tick, staying inside bounds.
+        """
+        self.start = start
+        self.stepSize = stepSize
+        self.bounds = bounds
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.random = np.random.default_rng(self.seed)
+        self.position = np.array(self.start, dtype=np.float64)
+
+    def nextTarget(self) -> Coordinate:
+        self.position += self.random.uniform(-self.stepSize, self.stepSize, 2)
+        self.position = np.clip(self.position, self.bounds[:2], self.bounds[2:])
+        return (float(self.position[0]), float(self.position[1]))
+
+
+class WanderTargetProvider(TargetProvider):
+    def __init__(self, start: Coordinate, bounds: Bounds, speed: float = 4, seed: int = 0, arriveDistance: float = 10):
+        """
+        Moves at a fixed speed towards a seeded random waypoint inside bounds and picks a new waypoint on arrival.
+        """
+        self.start = start
+        self.bounds = bounds
+        self.speed = speed
+        self.seed = seed
+        self.arriveDistance = arriveDistance
+        self.reset()
+
+    def reset(self):
+        self.random = np.random.default_rng(self.seed)
+        self.position = np.array(self.start, dtype=np.float64)
+        self.waypoint = self.pickWaypoint()
+
+    def pickWaypoint(self) -> np.ndarray:
+        return self.random.uniform(self.bounds[:2], self.bounds[2:])
+
+    def nextTarget(self) -> Coordinate:
+        offset = self.waypoint - self.position
+        distance = np.hypot(offset[0], offset[1])
+        if distance <= self.arriveDistance:
+            self.waypoint = self.pickWaypoint()
+        elif distance > 0:
+            self.position += offset * min(1.0, self.speed / distance)
+        return (float(self.position[0]), float(self.position[1]))
+
+
+PROVIDER_KINDS = ["circle", "figure-eight", "random-walk", "wander"]
+
+
+def createCrowdProviders(kind: str, count: int, bounds: Bounds, seed: int = 0,
+                         tracePath: Optional[str] = None) -> list[TargetProvider]:
+    """
+    Creates one provider per creature, spread over bounds and seeded per creature so runs are reproducible.
+    """
+    left, top, right, bottom = bounds
+    columns = max(1, int(np.ceil(np.sqrt(count))))
+    rows = max(1, int(np.ceil(count / columns)))
+    cellWidth = (right - left) / columns
+    cellHeight = (bottom - top) / rows
+    providers: list[TargetProvider] = []
+    for i in range(count):
+        center = (left + cellWidth * (i % columns + 0.5), top + cellHeight * (i // columns + 0.5))
+        size = min(cellWidth, cellHeight) * 0.4
+        if kind == "circle":
+            providers.append(CircleTargetProvider(center, size, phase=i))
+        elif kind == "figure-eight":
+            providers.append(FigureEightTargetProvider(center, size * 2, size, phase=i))
+        elif kind == "random-walk":
+            providers.append(RandomWalkTargetProvider(center, 8, bounds, seed + i))
+        elif kind == "wander":
+            providers.append(WanderTargetProvider(center, bounds, seed=seed + i))
+        elif kind == "trace":
+            if tracePath is None:
+                raise ValueError("The trace provider needs a trace file")
+            providers.append(RecordedTargetProvider.fromFile(tracePath))
+        else:
+            raise ValueError(f"Unknown target provider {kind}, expected one of {PROVIDER_KINDS + ['trace']}")
+    return providers
@@ -1,13 +1,32 @@
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import time
 import unittest
 import numpy as np
 import pygame
 from node import Node
+from outlineSampling import AdaptiveOutlineSampler
+from perfBudgets import findOverBudget
+from precision import setPrecision
 from legNode import LegNode
 from leg import Leg
 from section import Section
 from kinematicsHandler import KinematicsHandler
 from inverseKinematicsHandler import InverseKinematicsHandler
 from body import Body
+from creatureSpec import EXAMPLE_CREATURE_SPEC, compileSpecs, loadSpec, validateSpec
+from rasterizer import collectOutlines, fillPolygons, getSectionsInDrawOrder, rasterizeBodiesToArray
+from renderCache import RenderCache
+from renderPipeline import RenderPipeline
+from kinematicsCounters import CounterRecorder, KinematicsCounters
+from loadHarness import createBatch, createCrowd, runBatchLoad, runLoad
+from snapshot import SNAPSHOT_HEADER, restoreSnapshot, saveSnapshot
+from targetProviders import (CircleTargetProvider, RandomWalkTargetProvider, RecordedTargetProvider,
+                             TraceRecorder, WanderTargetProvider, createCrowdProviders)
+from stateServer import StateClient, StateDecoder, StateEncoder, StateServer, applyBodyState, getBodyState
 
 
 class TestNode(unittest.TestCase):
@@ -26,6 +45,12 @@ class TestNode(unittest.TestCase):
         self.assertAlmostEqual(node.x, 3.0)
         self.assertAlmostEqual(node.y, 4.0)
 
+    def test_normalize_vertical(self):
+        node = Node(0, 0, 5, None)
+        node.normalize(0, -10, 4)
+        self.assertAlmostEqual(node.x, 0.0)
+        self.assertAlmostEqual(node.y, -4.0)
+
 
 class TestLeg(unittest.TestCase):
     def test_leg_set_example(self):
@@ -76,6 +101,24 @@ class TestKinematicsHandler(unittest.TestCase):
         handler.applyForwardsDistanceConstraint(nodes)
         self.assertAlmostEqual(nodes[1].x, 10)
 
+    def test_batched_distance_constraint_matches_per_node(self):
+        handler = KinematicsHandler(25)
+        positions = np.random.default_rng(0).uniform(0, 300, (40, 12, 2))
+        positions[0, 3] = positions[0, 2] + (0, 60)  # Straight below the previous node
+        chains = [[Node(float(x), float(y), 5, None) for x, y in chain] for chain in positions]
+        for chain in chains:
+            handler.applyForwardsDistanceConstraint(chain)
+
+        handler.applyBatchedForwardsDistanceConstraint(positions)
+        np.testing.assert_array_equal(positions, [[(node.x, node.y) for node in chain] for chain in chains])
+
+    def test_batched_distance_constraint_skips_padding(self):
+        handler = KinematicsHandler(10)
+        positions = np.array([[[0, 0], [30, 0], [60, 0]], [[0, 0], [30, 0], [60, 0]]], dtype=np.float64)
+        handler.applyBatchedForwardsDistanceConstraint(positions, nodeCounts=[3, 2], nodeSpacing=[10, 20])
+        np.testing.assert_allclose(positions[0], [[0, 0], [10, 0], [20, 0]])
+        np.testing.assert_allclose(positions[1], [[0, 0], [20, 0], [60, 0]])
+
 
 class TestInverseKinematicsHandler(unittest.TestCase):
     def test_fabrik(self):
@@ -102,5 +145,489 @@ class TestBody(unittest.TestCase):
         body.display(screen)  # Visual test, ensure no exceptions
 
 
+class TestStateServer(unittest.TestCase):
+    def test_encoder_round_trip(self):
+        encoder = StateEncoder(keyframeInterval=3)
+        decoder = StateDecoder()
+        positions = np.array([[10.0, 20.0], [30.5, -4.25]])
+        for tick in range(6):
+            positions = positions + np.array([[1.3, -0.7], [0.2, 2.9]])
+            decodedTick, decoded = decoder.decode(encoder.encode(tick, positions))
+            self.assertEqual(decodedTick, tick)
+            np.testing.assert_allclose(decoded, positions, atol=1 / 32)
+
+    def test_body_state_round_trip(self):
+        body = Body([], 25)
+        body.setExampleBody()
+        body.nodes[0].x = 200
+        body.update(followMouse=False)
+        copy = Body([], 25)
+        copy.setExampleBody()
+        applyBodyState(copy, getBodyState(body))
+        np.testing.assert_allclose(getBodyState(copy), getBodyState(body))
+
+    def test_server_streams_to_client(self):
+        server = StateServer(port=0)
+        server.start()
+        try:
+            client = StateClient(port=server.port, timeout=5)
+            self.assertTrue(server.clientConnected.wait(timeout=5))
+            server.publish(np.array([[1.0, 2.0], [3.0, 4.0]]))
+            tick, positions = client.readFrame()
+            self.assertEqual(tick, 1)
+            np.testing.assert_allclose(positions, [[1.0, 2.0], [3.0, 4.0]])
+            client.close()
+        finally:
+            server.stop()
+
+    def test_slow_client_gets_latest_frame(self):
+        server = StateServer(port=0)
+        server.start()
+        try:
+            client = StateClient(port=server.port, timeout=5)
+            self.assertTrue(server.clientConnected.wait(timeout=5))
+            # Large frames fill the socket buffers while the client is not reading, so the server has to skip frames
+            base = np.random.default_rng(0).uniform(0, 1000, (4000, 2))
+            for tick in range(300):
+                positions = base + tick * 0.5
+                server.publish(positions)
+            tick = 0
+            while tick < 300:
+                tick, decoded = client.readFrame()
+            self.assertGreater(server.clients[0].droppedFrames, 0)
+            np.testing.assert_allclose(decoded, positions, atol=1 / 32)
+            client.close()
+        finally:
+            server.stop()
+
+    def test_disconnected_client_is_dropped(self):
+        server = StateServer(port=0)
+        server.start()
+        try:
+            client = StateClient(port=server.port, timeout=5)
+            self.assertTrue(server.clientConnected.wait(timeout=5))
+            client.close()
+            deadline = time.monotonic() + 5
+            while server.clients and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(server.clients, [])
+        finally:
+            server.stop()
+
+    def test_publish_requires_start(self):
+        with self.assertRaises(RuntimeError):
+            StateServer(port=0).publish(np.zeros((1, 2)))
+
+
+class TestSnapshot(unittest.TestCase):
+    def createMovedBody(self):
+        body = Body([], 25)
+        body.setExampleBody()
+        for i in range(20):
+            body.update(followMouse=False)
+            body.followMouse((300 + i * 5, 200))
+        body.switchColor()
+        return body
+
+    def test_restore_new_body(self):
+        body = self.createMovedBody()
+        restored = restoreSnapshot(saveSnapshot(body))
+        np.testing.assert_array_equal(getBodyState(restored), getBodyState(body))
+        self.assertEqual(restored.currentColorIndex, body.currentColorIndex)
+        self.assertIs(restored.nodes[2].legs[0].attachedNode, restored.nodes[2])
+        self.assertIs(restored.nodes[3].prevNode, restored.nodes[2])
+
+    def test_restore_keeps_iteration_cap(self):
+        body = self.createMovedBody()
+        body.nodes[2].legs[1].kinematicsHandler.maxIterations = 7
+        restored = restoreSnapshot(saveSnapshot(body))
+        self.assertEqual(restored.nodes[2].legs[1].kinematicsHandler.maxIterations, 7)
+        self.assertEqual(restored.nodes[2].legs[0].kinematicsHandler.maxIterations, 100)
+
+    def test_restore_into_existing_body(self):
+        body = self.createMovedBody()
+        target = Body([], 25)
+        target.setExampleBody()
+        restored = restoreSnapshot(saveSnapshot(body), target)
+        self.assertIs(restored, target)
+        for simulated in (body, target):
+            simulated.update(followMouse=False)
+            simulated.followMouse((500, 500))
+        np.testing.assert_array_equal(getBodyState(target), getBodyState(body))
+
+    def test_snapshot_is_compact_and_rebuilds_outlines(self):
+        body = self.createMovedBody()
+        data = saveSnapshot(body)
+        # Only node and lateral state is stored, restore timings are budgeted in perfTest.py
+        self.assertLess(len(data) * 4, len(pickle.dumps(body)))
+        restored = restoreSnapshot(data)
+        for section, restoredSection in zip(getSectionsInDrawOrder([body]), getSectionsInDrawOrder([restored])):
+            np.testing.assert_array_equal(restoredSection.curvePoints, section.curvePoints)
+
+    def test_rejects_leg_node_anchor(self):
+        data = bytearray(saveSnapshot(self.createMovedBody()))
+        # The anchor node kind follows the body's node count, colour count and three RGBA colours
+        kindOffset = SNAPSHOT_HEADER.size + (2 + 3 * 4) * 4
+        data[kindOffset] = 1
+        with self.assertRaises(ValueError):
+            restoreSnapshot(bytes(data))
+
+    def test_rejects_unknown_version(self):
+        data = bytearray(saveSnapshot(self.createMovedBody()))
+        data[4] = 99
+        with self.assertRaises(ValueError):
+            restoreSnapshot(bytes(data))
+
+
+class TestCreatureSpec(unittest.TestCase):
+    def test_example_file_matches_example_body(self):
+        self.assertEqual(loadSpec("creatures/example.json"), validateSpec(EXAMPLE_CREATURE_SPEC))
+        body = Body.fromSpec(loadSpec("creatures/example.json"))
+        example = Body([], 25)
+        example.setExampleBody()
+        np.testing.assert_array_equal(getBodyState(body), getBodyState(example))
+
+    def test_build_is_silent_and_validates(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            body = Body.fromSpec({"bodyShape": [10, 8, 6], "legs": [{"node": 1, "legShape": [4, 4], "targets": [[30, 0.5]]}]})
+            body.update(followMouse=True, target=(10, 10))
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(body.kinematicsHandler.node_spacing, 25)
+
+    def test_body_from_batch(self):
+        batch = compileSpecs([EXAMPLE_CREATURE_SPEC, EXAMPLE_CREATURE_SPEC], np.array([[0, 0], [300, 200]]))
+        body = Body.fromBatch(batch, 1)
+        np.testing.assert_array_equal(getBodyState(body), np.full((len(getBodyState(body)), 2), [300, 200]))
+
+    def test_rejects_invalid_attachment(self):
+        with self.assertRaises(ValueError):
+            validateSpec({"bodyShape": [10, 10], "legs": [{"node": 5, "legShape": [6], "targets": [[80, 0]]}]})
+
+    def test_compile_batch(self):
+        small = validateSpec({"bodyShape": [10, 8, 6], "legs": [{"node": 1, "legShape": [4, 4], "targets": [[30, 0.5]]}]})
+        example = validateSpec(EXAMPLE_CREATURE_SPEC)
+        batch = compileSpecs([example, small, example], np.array([[0, 0], [50, 60], [100, 0]]))
+        self.assertEqual(batch.bodyPositions.shape, (3, 12, 2))
+        np.testing.assert_array_equal(batch.bodyNodeCounts, [12, 3, 12])
+        np.testing.assert_array_equal(batch.nodeSpacing, [25, small["nodeSpacing"], 25])
+        np.testing.assert_array_equal(batch.bodyPositions[1, 0], [50, 60])
+        self.assertEqual(batch.bodyMask().sum(), 27)
+
+    def test_batch_update_matches_body_update(self):
+        small = validateSpec({"nodeSpacing": 12, "bodyShape": [10, 8, 6], "legs": []})
+        specs = [EXAMPLE_CREATURE_SPEC, small, EXAMPLE_CREATURE_SPEC]
+        batch = compileSpecs(specs, np.array([[0, 0], [50, 60], [300, 200]]))
+        bodies = [Body.fromBatch(batch, i) for i in range(len(batch))]
+        providers = [CircleTargetProvider((200, 200), 150, phase=i) for i in range(len(batch))]
+        for _ in range(100):
+            targets = np.array([provider.nextTarget() for provider in providers])
+            for body, target in zip(bodies, targets):
+                body.update(True, target)
+            batch.updateBodies(targets)
+
+        for i, body in enumerate(bodies):
+            np.testing.assert_array_equal(batch.bodyPositions[i, :len(body.nodes)], [(node.x, node.y) for node in body.nodes])
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_cached_circle_matches_pygame(self):
+        cache = RenderCache()
+        for center, radius, width in [((20.6, 30.2), 5, 3), ((40, 40), 23, 3), ((10.5, 50.9), 3, 0)]:
+            expected = pygame.Surface((80, 80))
+            pygame.draw.circle(expected, (255, 255, 255), center, radius, width)
+            actual = pygame.Surface((80, 80))
+            cache.drawCircle(actual, (255, 255, 255), center, radius, width)
+            np.testing.assert_array_equal(pygame.surfarray.array3d(actual), pygame.surfarray.array3d(expected))
+
+    def test_lru_eviction(self):
+        cache = RenderCache(maxSize=2)
+        first = cache.getCircle(5, 3, (255, 0, 0))
+        cache.getCircle(6, 3, (255, 0, 0))
+        self.assertIs(cache.getCircle(5, 3, (255, 0, 0)), first)
+        cache.getCircle(7, 3, (255, 0, 0))
+        self.assertEqual(len(cache.entries), 2)
+        self.assertNotIn(("circle", 6, 3, (255, 0, 0, 255)), cache.entries)
+        self.assertEqual(cache.hits, 1)
+
+
+class TestRenderPipeline(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+
+    def drawBody(self, body, screen):
+        screen.fill((50, 50, 60))
+        body.displayNodes(screen)
+        body.display(screen)
+
+    def test_pipelined_frames_match_serial(self):
+        serialBody = Body([], 25)
+        serialBody.setExampleBody()
+        pipelinedBody = Body([], 25)
+        pipelinedBody.setExampleBody()
+        for body in (serialBody, pipelinedBody):
+            body.update(followMouse=True, target=(10, 10))
+
+        pipeline = RenderPipeline()
+        serialScreen = pygame.Surface((500, 500))
+        pipelinedScreen = pygame.Surface((500, 500))
+        try:
+            for tick in range(30):
+                target = (250 + 150 * np.cos(tick / 5), 250 + 150 * np.sin(tick / 5))
+
+                self.drawBody(serialBody, serialScreen)
+                serialBody.update(followMouse=True, target=target)
+
+                frame = pipeline.capture(pipelinedBody)
+                pipeline.startUpdate(pipelinedBody, followMouse=True, target=target)
+                self.drawBody(frame, pipelinedScreen)
+                pipeline.finishUpdate()
+
+                np.testing.assert_array_equal(pygame.surfarray.array3d(pipelinedScreen),
+                                              pygame.surfarray.array3d(serialScreen))
+        finally:
+            pipeline.close()
+
+
+class TestRasterizer(unittest.TestCase):
+    def createBodies(self):
+        bodies = []
+        for k in range(3):
+            body = Body([], 25)
+            body.setExampleBody()
+            for i in range(30):
+                body.update(followMouse=True, target=(100 + k * 120 + 50 * np.cos(i / 7), 150 + k * 60 + 50 * np.sin(i / 9)))
+            bodies.append(body)
+        return bodies
+
+    def test_matches_pygame_polygon_fill(self):
+        bodies = self.createBodies()
+        expected = pygame.Surface((500, 400))
+        expected.fill((50, 50, 60))
+        for section in getSectionsInDrawOrder(bodies):
+            section.displayFilledInParametricCurve(expected)
+        expectedPixels = pygame.surfarray.array3d(expected)
+        actualPixels = rasterizeBodiesToArray(bodies, (500, 400), (50, 50, 60))
+
+        # The rasterizer leaves out some boundary pixels pygame includes, so only edges may differ
+        filled = (expectedPixels != [50, 50, 60]).any(axis=2).sum()
+        different = (actualPixels != expectedPixels).any(axis=2).sum()
+        self.assertGreater(filled, 1000)
+        self.assertLess(different, filled * 0.03)
+
+    def test_later_polygons_are_drawn_on_top(self):
+        section = Section([Node(0, 0, 5, None)], 10)
+        section.curvePoints = [[0, 0], [20, 0], [20, 20], [0, 20]]
+        top = Section([Node(0, 0, 5, None)], 10)
+        top.curvePoints = [[5, 5], [15, 5], [15, 15], [5, 15]]
+        top.switchColor()
+        screen = pygame.Surface((30, 30))
+        screen.fill((0, 0, 0))
+        pixels = pygame.surfarray.pixels3d(screen)
+        fillPolygons(pixels, *collectOutlines([section, top]))
+        del pixels
+        self.assertEqual(tuple(screen.get_at((10, 10)))[:3], tuple(top.getCurrentColor())[:3])
+        self.assertEqual(tuple(screen.get_at((2, 2)))[:3], tuple(section.getCurrentColor())[:3])
+        self.assertEqual(tuple(screen.get_at((25, 25)))[:3], (0, 0, 0))
+
+    def test_skips_non_finite_outlines(self):
+        broken = Section([Node(0, 0, 5, None)], 10)
+        broken.curvePoints = [[0, 0], [20, np.nan], [20, 20], [0, 20]]
+        section = Section([Node(0, 0, 5, None)], 10)
+        section.curvePoints = [[0, 0], [20, 0], [20, 20], [0, 20]]
+        vertices, offsets, colors = collectOutlines([broken, section])
+        self.assertEqual(len(offsets), 2)
+        pixels = np.zeros((30, 30, 3), dtype=np.uint8)
+        fillPolygons(pixels, vertices, offsets, colors)
+        self.assertEqual((pixels != 0).any(axis=2).sum(), 400)
+
+
+class TestOutlineSampling(unittest.TestCase):
+    def createBody(self) -> Body:
+        body = Body.fromSpec(dict(EXAMPLE_CREATURE_SPEC, position=[300, 300]))
+        provider = CircleTargetProvider((400, 350), 200)
+        for _ in range(150):
+            body.update(True, provider.nextTarget())
+        return body
+
+    def resample(self, body: Body, sampler) -> int:
+        body.setOutlineSampler(sampler)
+        sections = getSectionsInDrawOrder([body])
+        for section in sections:
+            section.updateCurvePoints()
+        return sum(len(section.curvePoints) for section in sections)
+
+    def test_fewer_samples_with_matching_fill(self):
+        body = self.createBody()
+        uniformCount = self.resample(body, None)
+        uniformPixels = rasterizeBodiesToArray([body], (800, 700))
+        adaptiveCount = self.resample(body, AdaptiveOutlineSampler())
+        adaptivePixels = rasterizeBodiesToArray([body], (800, 700))
+
+        self.assertLess(adaptiveCount * 4, uniformCount)
+        filled = (uniformPixels != [50, 50, 60]).any(axis=2).sum()
+        different = (adaptivePixels != uniformPixels).any(axis=2).sum()
+        self.assertLess(different, filled * 0.01)
+
+    def test_scale_and_frame_budget(self):
+        body = self.createBody()
+        fullSize = self.resample(body, AdaptiveOutlineSampler(scale=1))
+        zoomedOut = self.resample(body, AdaptiveOutlineSampler(scale=0.25))
+        self.assertLess(zoomedOut, fullSize)
+
+        sampler = AdaptiveOutlineSampler(frameBudget=100)
+        self.resample(body, sampler)
+        self.assertEqual(sampler.samples, sampler.demand)
+        sampler.beginFrame()
+        self.resample(body, sampler)
+        self.assertLess(sampler.samples, sampler.demand)
+        self.assertLess(sampler.samples, 150)
+
+
+class TestTargetProviders(unittest.TestCase):
+    def test_circle_stays_on_radius(self):
+        provider = CircleTargetProvider((100, 100), 50, period=20)
+        for _ in range(30):
+            x, y = provider.nextTarget()
+            self.assertAlmostEqual(np.hypot(x - 100, y - 100), 50)
+
+    def test_seeded_providers_are_reproducible(self):
+        bounds = (0, 0, 500, 400)
+        for create in (lambda: RandomWalkTargetProvider((250, 200), 8, bounds, seed=3),
+                       lambda: WanderTargetProvider((250, 200), bounds, seed=3)):
+            provider, other = create(), create()
+            first = [provider.nextTarget() for _ in range(100)]
+            self.assertEqual(first, [other.nextTarget() for _ in range(100)])
+            provider.reset()
+            self.assertEqual(first, [provider.nextTarget() for _ in range(100)])
+            for x, y in first:
+                self.assertTrue(0 <= x <= 500 and 0 <= y <= 400)
+
+    def test_recorded_trace_round_trip(self):
+        recorder = TraceRecorder(CircleTargetProvider((0, 0), 10, period=8))
+        recorded = [recorder.nextTarget() for _ in range(8)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            recorder.save(path)
+            replay = RecordedTargetProvider.fromFile(path)
+        np.testing.assert_allclose([replay.nextTarget() for _ in range(16)], recorded * 2)
+
+    def test_body_follows_provider(self):
+        body = Body([], 25)
+        body.setExampleBody()
+        body.targetProvider = RecordedTargetProvider([(400, 300)])
+        for _ in range(200):
+            body.update(followMouse=True)
+        self.assertLess(body.nodes[0].coordinateDistance(400, 300), 1)
+
+
+class TestLoadHarness(unittest.TestCase):
+    def test_run_load_is_reproducible(self):
+        positions = []
+        for _ in range(2):
+            bodies = createCrowd(createCrowdProviders("wander", 3, (0, 0, 600, 400), seed=1))
+            report = runLoad(bodies, 20)
+            self.assertEqual(report.creatureTicks, 60)
+            self.assertGreater(report.creatureTicksPerSecond, 0)
+            positions.append(np.concatenate([getBodyState(body) for body in bodies]))
+        np.testing.assert_array_equal(positions[0], positions[1])
+
+    def test_batched_load_matches_bodies(self):
+        providers = createCrowdProviders("wander", 3, (0, 0, 600, 400), seed=1)
+        batch = createBatch(providers)
+        report = runBatchLoad(batch, providers, 20)
+        self.assertEqual(report.creatureTicks, 60)
+        bodies = createCrowd(createCrowdProviders("wander", 3, (0, 0, 600, 400), seed=1))
+        runLoad(bodies, 20)
+        for i, body in enumerate(bodies):
+            np.testing.assert_array_equal(batch.bodyPositions[i], [(node.x, node.y) for node in body.nodes])
+
+
+class TestKinematicsCounters(unittest.TestCase):
+    def test_counts_constraint_corrections(self):
+        handler = KinematicsHandler(10)
+        handler.counters = KinematicsCounters()
+        handler.applyForwardsDistanceConstraint([Node(0, 0, 5, None), Node(15, 0, 5, None), Node(20, 0, 5, None)])
+        self.assertEqual(handler.counters.constraintCorrections, 1)
+
+    def test_counts_fabrik_iterations_and_stalls(self):
+        handler = InverseKinematicsHandler(1, 10, maxIterations=20)
+        handler.counters = KinematicsCounters()
+        handler.fabrik([Node(0, 0, 5, None), Node(15, 0, 5, None)], (10, 0))
+        self.assertEqual(handler.counters.snapshot()["fabrikSolves"], 1)
+        self.assertEqual(handler.counters.fabrikIterations, 1)
+
+        # A chain folded onto itself never reaches the target, so the solver gives up instead of looping forever
+        folded = [Node(10, 10, 5, None) for _ in range(5)]
+        handler.fabrik(folded, (8.5, 8.5))
+        self.assertEqual(handler.counters.fabrikStalls, 1)
+        self.assertEqual(handler.counters.fabrikIterations, 21)
+
+    def test_recorder_aggregates_ticks_and_creatures(self):
+        recorder = CounterRecorder()
+        bodies = createCrowd(createCrowdProviders("wander", 2, (0, 0, 600, 400)))
+        for i, body in enumerate(bodies):
+            recorder.attach(f"creature{i}", body)
+        runLoad(bodies, 120, recorder)
+
+        self.assertEqual(len(recorder.perTick()), 120)
+        totals = recorder.totals()
+        self.assertGreater(totals["constraintCorrections"], 0)
+        self.assertGreater(totals["stepEvents"], 0)
+        self.assertGreater(totals["tooFarExtensions"], 0)
+        self.assertEqual(totals["fabrikSolves"] + totals["tooFarExtensions"], 2 * 120 * 4)
+        perCreature = recorder.perCreature()
+        self.assertEqual(sum(counts["stepEvents"] for counts in perCreature.values()), totals["stepEvents"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "counters.csv")
+            recorder.exportCsv(path)
+            with open(path) as file:
+                self.assertEqual(len(file.readlines()), 1 + 120 * 2)
+
+
+
+class TestPrecision(unittest.TestCase):
+    def tearDown(self):
+        setPrecision("float64")
+
+    def runBatch(self, precision: str, ticks: int) -> np.ndarray:
+        setPrecision(precision)
+        providers = createCrowdProviders("wander", 8, (0, 0, 1000, 700), seed=3)
+        batch = createBatch(providers)
+        runBatchLoad(batch, providers, ticks)
+        return batch.bodyPositions
+
+    def test_float32_batch(self):
+        setPrecision("float32")
+        batch = compileSpecs([EXAMPLE_CREATURE_SPEC] * 2)
+        self.assertEqual(batch.bodyPositions.dtype, np.float32)
+        self.assertEqual(batch.nodeSpacing.dtype, np.float32)
+        batch.updateBodies(np.array([[300, 200], [100, 50]]))
+        self.assertEqual(batch.bodyPositions.dtype, np.float32)
+        with self.assertRaises(ValueError):
+            setPrecision("float16")
+
+    def test_batch_drift_is_bounded(self):
+        double = self.runBatch("float64", 3000)
+        single = self.runBatch("float32", 3000)
+        self.assertEqual(single.dtype, np.float32)
+        self.assertLess(np.abs(single - double).max(), 0.01)
+
+
+class TestPerfBudgets(unittest.TestCase):
+    def test_reports_counts_and_times_over_budget(self):
+        budgets = {"body": {"counts": {"fabrikIterations": 100}, "normalizedTimes": {"update": 10}}}
+        within = {"body": {"counts": {"fabrikIterations": 104}, "normalizedTimes": {"update": 19}}}
+        self.assertEqual(findOverBudget(within, budgets), [])
+
+        over = {"body": {"counts": {"fabrikIterations": 200, "stepEvents": 1}, "normalizedTimes": {"update": 21}},
+                "crowd": {"counts": {}, "normalizedTimes": {}}}
+        failures = findOverBudget(over, budgets)
+        self.assertEqual(len(failures), 4)
+        self.assertTrue(any("fabrikIterations" in failure for failure in failures))
+        self.assertTrue(any("crowd" in failure for failure in failures))
+
+
 if __name__ == "__main__":
     unittest.main()